@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import zipfile
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from core.backtester import Backtester
+from core.data_loader import DataLoader
+from core.resample import get_interval_delta
+from strategies.indicators import IndicatorCache
+from strategies.sma_cross import SmaCrossover
+
+STAGES = ("load", "signals", "backtest")
+
+
+def write_synthetic_klines(data_dir, symbol, interval="1m", year_month="2025-02", seed=0):
+    """Write a month of random-walk klines of one pair as a Binance archive named
+       '<symbol>-<interval>-<year_month>.zip', with microsecond timestamps like the 2025 spot archives.
+       Return the path to the archive."""
+    delta = get_interval_delta(interval)
+    start = pd.Timestamp(f"{year_month}-01")
+    timestamps = pd.date_range(start, start + pd.offsets.MonthBegin(1), freq=delta, inclusive="left")
+    n_rows = len(timestamps)
+    random_generator = np.random.default_rng(seed)
+
+    close = 0.05 * np.exp(np.cumsum(random_generator.normal(0, 0.001, n_rows)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(random_generator.normal(0, 0.0005, n_rows)) * close
+    volume = random_generator.uniform(1, 100, n_rows)
+    open_time = timestamps.asi8 // 1000
+    klines = pd.DataFrame({
+        "timestamp": open_time,
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": volume,
+        "close_time": open_time + delta // pd.Timedelta(microseconds=1) - 1,
+        "quote_asset_volume": volume * close,
+        "number_of_trades": random_generator.integers(1, 500, n_rows),
+        "taker_buy_base_asset_volume": volume / 2,
+        "taker_buy_quote_asset_volume": volume * close / 2,
+        "ignore": 0
+    })
+
+    name = f"{symbol}-{interval}-{year_month}"
+    path_to_zip = os.path.join(data_dir, f"{name}.zip")
+    os.makedirs(data_dir, exist_ok=True)
+    with zipfile.ZipFile(path_to_zip, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{name}.csv", klines.to_csv(header=False, index=False, float_format="%.8f"))
+
+    return path_to_zip
+
+
+def generate_dataset(data_dir, symbols=10, year_months=("2025-02",), interval="1m", seed=0):
+    """Write synthetic archives for symbols x months and return the paths to them."""
+    return [write_synthetic_klines(data_dir, f"SYN{number:03d}BTC", interval, year_month, seed + number)
+            for number in range(symbols) for year_month in year_months]
+
+
+@contextmanager
+def _working_dir(path):
+    # The pipeline writes to relative data/ and results/ directories, keep them out of the repository
+    previous_dir = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous_dir)
+
+
+def _measure(function, repeat, trace_memory):
+    """Run the function repeat times and once more under tracemalloc. Timings are taken without tracing,
+       so its overhead never shows up in them. Return the stage record and the last result."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        runs.append(time.perf_counter() - start)
+
+    record = {"seconds": min(runs), "runs": runs}
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            result = function()
+            record["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+
+    return record, result
+
+
+def run_benchmark(symbols=10, year_months=("2025-02",), interval="1m", repeat=3, engine="vectorbt",
+                  trace_memory=True, seed=0):
+    """Time every stage of the load -> signal -> portfolio pipeline over a synthetic dataset and return
+       a JSON-serializable dict with the best time, all run times and the peak traced memory of every stage."""
+    stages = {}
+    with tempfile.TemporaryDirectory() as work_dir, _working_dir(work_dir):
+        paths_to_zips = generate_dataset("archives", symbols, year_months, interval, seed)
+
+        stages["load"], price_data = _measure(lambda: DataLoader(paths_to_zips).create_parquet("benchmark"),
+                                              repeat, trace_memory)
+        # A fresh indicator cache every run, so the signals are really computed
+        stages["signals"], _ = _measure(lambda: SmaCrossover(price_data, indicator_cache=IndicatorCache())
+                                        .generate_signals(), repeat, trace_memory)
+        stages["backtest"], _ = _measure(
+            lambda: Backtester(price_data, SmaCrossover(price_data, indicator_cache=IndicatorCache()),
+                               engine=engine).get_backtest_results(), repeat, trace_memory)
+
+    return {
+        "config": {"symbols": symbols, "year_months": list(year_months), "interval": interval, "repeat": repeat,
+                   "engine": engine, "rows": len(price_data)},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "numpy": np.__version__, "pandas": pd.__version__},
+        "stages": stages
+    }
+
+
+def compare(results, baseline, threshold=0.2):
+    """Compare the stages of two benchmark results. Return a list of the regressions: stages whose best time
+       or peak memory grew by more than the threshold fraction over the baseline."""
+    if results["config"] != baseline["config"]:
+        raise ValueError("The baseline was measured with another configuration.")
+
+    regressions = []
+    for stage, record in results["stages"].items():
+        baseline_record = baseline["stages"].get(stage)
+        if baseline_record is None:
+            continue
+        for measure in ("seconds", "peak_mb"):
+            if measure in record and measure in baseline_record and \
+                    record[measure] > baseline_record[measure] * (1 + threshold):
+                regressions.append({"stage": stage, "measure": measure, "baseline": baseline_record[measure],
+                                    "value": record[measure],
+                                    "change": record[measure] / baseline_record[measure] - 1})
+
+    return regressions
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the load -> signal -> portfolio pipeline offline.")
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--months", nargs="+", default=["2025-02"])
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engine", default="vectorbt", choices=Backtester.ENGINES)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run of every stage")
+    parser.add_argument("--output", default="results/benchmark.json")
+    parser.add_argument("--baseline", default="benchmarks/baseline.json")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.symbols, args.months, args.interval, args.repeat, args.engine,
+                            trace_memory=not args.no_memory)
+    save_results(results, args.output)
+    for stage, record in results["stages"].items():
+        peak = f", peak {record['peak_mb']:.1f} MB" if "peak_mb" in record else ""
+        print(f"{stage}: {record['seconds']:.3f} s{peak}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create it.")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    for regression in regressions:
+        print(f"Regression in {regression['stage']} {regression['measure']}: {regression['baseline']:.3f} -> "
+              f"{regression['value']:.3f} ({regression['change']:+.0%})")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
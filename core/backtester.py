@@ -1,33 +1,165 @@
-import os
+import time
+from importlib import metadata
+import numpy as np
 import pandas as pd
-import vectorbt as vbt
+from core import engine
+from core.instrumentation import stage_tracker
+from core.metrics import compute_metrics, compute_simulation_metrics
+from core.reporting import save_csv
 from strategies.base import StrategyBase
 
 
+def run_portfolio(close, signal, engine_name="vectorbt", fees=0.0, slippage=0.0, stop_loss=0.0, take_profit=0.0,
+                  size=1.0, freq="1min"):
+    """Simulate the signals with vectorbt or the compiled engine and return the metrics with a row per column."""
+    if isinstance(close, pd.Series):
+        close, signal = close.to_frame(), pd.DataFrame({close.name: signal.to_numpy()}, index=close.index)
+
+    if engine_name == "numba":
+        result = engine.simulate(close, signal, fees=fees, slippage=slippage, stop_loss=stop_loss,
+                                 take_profit=take_profit, size=size)
+        return compute_simulation_metrics(result, freq=freq)
+
+    # vectorbt takes seconds to import, so it is only loaded by runs that use it
+    import vectorbt as vbt
+
+    # The signal marks the bars to be in a position, so the position is closed as soon as the signal drops
+    portfolio = vbt.Portfolio.from_signals(
+        close,
+        signal,
+        ~signal,
+        fees=fees,
+        slippage=slippage,
+        sl_stop=stop_loss or None,
+        tp_stop=take_profit or None,
+        size=size,
+        size_type="percent",
+        freq=freq
+    )
+
+    return Backtester.get_portfolio_metrics(portfolio, freq)
+
+
 class Backtester:
     """Backtester class evaluates trading strategies and calculates metrics."""
     RESULT_DIR = "results"
+    ENGINES = ("vectorbt", "numba")
 
-    def __init__(self, price_data: pd.DataFrame, strategy: StrategyBase):
+    def __init__(self, price_data: pd.DataFrame, strategy: StrategyBase, engine: str = "vectorbt",
+                 fees: float = 0.0, slippage: float = 0.0, stop_loss: float = 0.0, take_profit: float = 0.0,
+                 size: float = 1.0, reporter=None, results_store=None, dataset: str = None,
+                 close_matrix: pd.DataFrame = None, freq: str = "1min"):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine}, expected one of {self.ENGINES}.")
         self.price_data = price_data
         self.strategy = strategy
+        # vectorbt or the compiled bar-by-bar kernel of core.engine
+        self.engine = engine
+        self.fees = fees
+        self.slippage = slippage
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.size = size
+        # Charts are left to an optional core.reporting.ChartReporter, so plotting never slows the backtest down
+        self.reporter = reporter
+        self.results_store = results_store
+        # Fingerprint of the price data, hashed from the frame when not given (e.g. ParquetStore.get_fingerprint)
+        self.dataset = dataset
+        # Aligned close matrix of the same data (e.g. the memory-mapped one of core.cache.MatrixCache),
+        # so that the prices aren't pivoted again
+        self.close_matrix = close_matrix
+        # Bar frequency the Sharpe ratio is annualized for, e.g. core.resample.INTERVAL_FREQS[interval]
+        self.freq = freq
 
-    def get_backtest_results(self):
-        # Run backtest and receive a curve
-        self.strategy.run_backtest()
-
-        # Calculate key metrics and call run_backtest
-        metrics = self.strategy.get_metrics()
-        os.makedirs(self.RESULT_DIR, exist_ok=True)
-        pd.DataFrame([metrics]).to_csv(os.path.join(self.RESULT_DIR, f"metrics.csv"))
-
-        # Form the portfolio
-        portfolio = vbt.Portfolio.from_signals(
-            self.price_data["close"],
-            self.price_data["signal"],
-            freq="1min"
-        )
-        # Get the portfolio result
-        result = portfolio.total_return()
+    def is_multi_symbol(self):
+        return "symbol" in self.price_data.columns
+
+    @staticmethod
+    def get_portfolio_metrics(portfolio, freq="1min"):
+        """Compute the metrics of every column of a vectorbt portfolio with core.metrics, from its value and closed
+           trades, so both engines report the same metrics. Return a frame with a row per column."""
+        trades = portfolio.trades.closed.values
+        # Trade returns are taken on the whole cash spent, entry fees included, like in core.engine
+        trade_returns = trades["pnl"] / (trades["size"] * trades["entry_price"] + trades["entry_fees"])
+        return compute_metrics(portfolio.value(), trades["col"], trade_returns,
+                               portfolio.position_mask().mean().to_numpy(), init_cash=np.asarray(portfolio.init_cash),
+                               freq=freq)
+
+    @staticmethod
+    def get_summary(result):
+        """Return the metrics of the strategy: the portfolio metrics averaged over the trading pairs."""
+        return {name: float(value) for name, value in result.mean().items()}
+
+    def run_portfolio(self, close, signal):
+        """Simulate the signals with the chosen engine and settings and return the metrics with a row per column."""
+        return run_portfolio(close, signal, self.engine, **self.get_settings())
+
+    @staticmethod
+    def get_engine_version(engine_name):
+        if engine_name == "numba":
+            return f"numba-{engine.ENGINE_VERSION}"
+        return f"vectorbt-{metadata.version('vectorbt')}"
+
+    def get_settings(self):
+        return {"fees": self.fees, "slippage": self.slippage, "stop_loss": self.stop_loss,
+                "take_profit": self.take_profit, "size": self.size, "freq": self.freq}
+
+    def get_run_key(self):
+        """Return the key of the run in the results store."""
+        if self.dataset is None:
+            self.dataset = self.results_store.get_dataset_fingerprint(self.price_data)
+
+        return self.results_store.get_key(self.get_strategy_name(), self.strategy.get_params(), self.dataset,
+                                          self.get_engine_version(self.engine), self.get_settings())
+
+    def get_strategy_name(self):
+        return getattr(self.strategy, "NAME", None) or type(self.strategy).__name__
+
+    def save_results(self, metrics, result):
+        """Write the strategy metrics and the per-symbol metrics to the result directory and return the
+           strategy metrics with the total return for a single series or the per-symbol metrics frame."""
+        save_csv(pd.DataFrame([metrics]), self.RESULT_DIR, "metrics.csv")
+
+        if not self.is_multi_symbol():
+            return metrics, float(result["total_return"].iloc[0])
+
+        result.index.name = "symbol"
+        save_csv(result, self.RESULT_DIR, "symbol_metrics.csv")
 
         return metrics, result
+
+    def get_backtest_results(self):
+        """Return the strategy metrics and the portfolio result: the total return for a single series,
+           or a frame of per-symbol metrics for a symbol-tagged frame, where every trading pair runs as its own
+           column of a single portfolio. With a core.results.ResultsStore a repeated run with the same strategy,
+           parameters, data, engine and settings returns the stored results at once."""
+        start_time = time.perf_counter()
+        if self.results_store is not None:
+            run_key = self.get_run_key()
+            stored = self.results_store.get(run_key)
+            if stored is not None:
+                return self.save_results(*stored)
+
+        # Hand the curves over to the reporting stage
+        if self.reporter is not None:
+            self.reporter.submit_backtest(self.strategy)
+
+        # Align the prices and signals with a column per trading pair, carrying the last known price over
+        # missing bars
+        close_matrix = self.close_matrix.ffill() if self.close_matrix is not None else None
+        close, signal = self.strategy.get_signal_matrices(close_matrix)
+
+        # Form the portfolio, one column per trading pair
+        with stage_tracker.stage("backtest.portfolio", engine=self.engine) as event:
+            result = self.run_portfolio(close, signal)
+            event["rows"] = close.size
+
+        # The strategy metrics summarize the same portfolio, with its engine and trading costs
+        metrics = self.get_summary(result)
+
+        if self.results_store is not None:
+            self.results_store.put(run_key, self.get_strategy_name(), self.strategy.get_params(), self.dataset,
+                                   self.get_engine_version(self.engine), result, self.get_settings(), metrics,
+                                   time.perf_counter() - start_time)
+
+        return self.save_results(metrics, result)
@@ -0,0 +1,108 @@
+import sys
+import time
+import argparse
+import pandas as pd
+from core.backtester import Backtester, run_portfolio
+from core.data_loader import DataLoader
+from core.instrumentation import stage_tracker
+from core.reporting import save_csv
+from core.resample import INTERVAL_FREQS, Resampler
+from core.runner import BacktestJob, get_job_table
+from core.store import ParquetStore
+from strategies import registry
+from strategies.indicators import IndicatorCache
+
+
+class BatchRunner:
+    """BatchRunner class evaluates many registered strategies over one loaded dataset. The close matrix
+       is pivoted once and all strategies share one IndicatorCache, so every indicator is computed a single
+       time however many strategies and parameter sets read it."""
+    RESULT_DIR = "results"
+
+    def __init__(self, price_data: pd.DataFrame, engine="vectorbt", fees=0.0, slippage=0.0, freq="1min"):
+        if engine not in Backtester.ENGINES:
+            raise ValueError(f"Unknown engine {engine}, expected one of {Backtester.ENGINES}.")
+        self.price_data = price_data
+        self.indicator_cache = IndicatorCache()
+        self.settings = {"engine_name": engine, "fees": fees, "slippage": slippage, "freq": freq}
+
+    @staticmethod
+    def get_jobs(names=None, grid=False, symbols=None):
+        """Return a BacktestJob per registered strategy with its default parameters,
+           or with grid a job per combination of its parameter space."""
+        jobs = []
+        for name in names or registry.get_strategies():
+            strategy_class = registry.get_strategy(name)
+            for params in strategy_class.get_param_grid() if grid else [{}]:
+                jobs.append(BacktestJob(strategy_class, params, symbols))
+
+        return jobs
+
+    def run(self, jobs):
+        """Run the jobs and return a table with a row per (job, symbol) with the metrics and the job wall time."""
+        for job in jobs:
+            missing_columns = set(job.strategy_class.REQUIRED_COLUMNS) - set(self.price_data.columns)
+            if missing_columns:
+                raise ValueError(f"{job.strategy_class.__name__} needs the missing columns {sorted(missing_columns)}.")
+
+        # Pivot the prices once for all jobs
+        close = DataLoader.pivot(self.price_data, "close").ffill() if "symbol" in self.price_data.columns else None
+        results = []
+
+        for job_number, job in enumerate(jobs):
+            start_time = time.perf_counter()
+            strategy = job.strategy_class(self.price_data, indicator_cache=self.indicator_cache, **job.params)
+            with stage_tracker.stage("batch.job", strategy=strategy.NAME, rows=len(self.price_data)):
+                # The declared indicators are computed once and found in the shared cache by later jobs
+                for indicator, window in strategy.get_required_indicators():
+                    self.indicator_cache.get(self.price_data, indicator, window)
+                close_matrix, signal = strategy.get_signal_matrices(close)
+                if job.symbols is not None:
+                    close_matrix, signal = close_matrix[list(job.symbols)], signal[list(job.symbols)]
+                job_metrics = run_portfolio(close_matrix, signal, **self.settings)
+
+            results.append(get_job_table(job_metrics, job_number, strategy.NAME, strategy.get_params(),
+                                         time.perf_counter() - start_time))
+
+        if not results:
+            return pd.DataFrame()
+
+        return pd.concat(results, ignore_index=True)
+
+    def save(self, results: pd.DataFrame, file_name="batch_metrics.csv"):
+        return save_csv(results, self.RESULT_DIR, file_name, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run registered strategies over the stored data in one batch.")
+    parser.add_argument("--strategies", nargs="+", choices=sorted(registry.get_strategies()),
+                        help="strategies to run, all registered ones by default")
+    parser.add_argument("--grid", action="store_true", help="run every combination of the parameter spaces")
+    parser.add_argument("--store", default="data/store")
+    parser.add_argument("--symbols", nargs="+")
+    parser.add_argument("--interval", default="1m", choices=list(INTERVAL_FREQS))
+    parser.add_argument("--months", nargs="+")
+    parser.add_argument("--engine", default="vectorbt", choices=Backtester.ENGINES)
+    parser.add_argument("--fees", type=float, default=0.0)
+    parser.add_argument("--slippage", type=float, default=0.0)
+    parser.add_argument("--output", default="batch_metrics.csv")
+    args = parser.parse_args(argv)
+
+    jobs = BatchRunner.get_jobs(args.strategies, args.grid)
+    # Load the data once, with only the columns the chosen strategies need
+    columns = sorted(set().union(*(job.strategy_class.REQUIRED_COLUMNS for job in jobs)))
+    # Higher intervals are derived from the stored 1m bars
+    price_data = Resampler(ParquetStore(args.store)).read(args.symbols, args.interval, args.months, columns=columns)
+    if price_data.empty:
+        print("No stored data matches the request.")
+        return 1
+
+    batch_runner = BatchRunner(price_data, args.engine, args.fees, args.slippage, INTERVAL_FREQS[args.interval])
+    results = batch_runner.run(jobs)
+    print(f"{len(jobs)} jobs finished, metrics saved to {batch_runner.save(results, args.output)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from core.data_loader import DataLoader
+
+
+class MatrixCache:
+    """MatrixCache class keeps aligned (timestamp x symbol) matrices as .npy files under a content-hash key.
+       Later runs and worker processes open them memory-mapped, without copying or parsing anything.
+       The least recently used entries are evicted once the cache grows over max_bytes."""
+    META_FILE = "meta.json"
+    INDEX_FILE = "index.npy"
+
+    def __init__(self, root_dir="data/cache", max_bytes=4 * 1024 ** 3):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    @staticmethod
+    def get_key(*parts):
+        """Hash any JSON-serializable description of the cached content into a key."""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+    def get_path(self, key):
+        return os.path.join(self.root_dir, key)
+
+    def put(self, key, matrices):
+        """Save a dict of equally shaped matrices (name -> DataFrame) that share one index and columns."""
+        first_matrix = next(iter(matrices.values()))
+        # Write into a temporary directory and rename it, so readers never see a half written entry
+        path_to_tmp = f"{self.get_path(key)}.{os.getpid()}.tmp"
+        os.makedirs(path_to_tmp, exist_ok=True)
+        np.save(os.path.join(path_to_tmp, self.INDEX_FILE), first_matrix.index.to_numpy())
+        for name, matrix in matrices.items():
+            np.save(os.path.join(path_to_tmp, f"{name}.npy"),
+                    np.ascontiguousarray(matrix.reindex_like(first_matrix).to_numpy()))
+        with open(os.path.join(path_to_tmp, self.META_FILE), "w") as f:
+            json.dump({"names": list(matrices), "columns": list(first_matrix.columns),
+                       "index_name": first_matrix.index.name, "columns_name": first_matrix.columns.name}, f)
+
+        shutil.rmtree(self.get_path(key), ignore_errors=True)
+        try:
+            os.replace(path_to_tmp, self.get_path(key))
+        except OSError:
+            # Another process has cached the same content in the meantime
+            shutil.rmtree(path_to_tmp, ignore_errors=True)
+        self.evict(keep=key)
+
+    def get(self, key):
+        """Return the dict of memory-mapped matrices saved under the key, or None on a cache miss."""
+        path_to_entry = self.get_path(key)
+        try:
+            with open(os.path.join(path_to_entry, self.META_FILE)) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        # The directory modification time marks the last access for the LRU eviction
+        os.utime(path_to_entry)
+        index = pd.Index(np.load(os.path.join(path_to_entry, self.INDEX_FILE)), name=meta["index_name"])
+        columns = pd.Index(meta["columns"], name=meta["columns_name"])
+
+        return {
+            name: pd.DataFrame(np.load(os.path.join(path_to_entry, f"{name}.npy"), mmap_mode="r"),
+                               index=index, columns=columns, copy=False)
+            for name in meta["names"]
+        }
+
+    def _get_entries(self):
+        entries = []
+        for key in os.listdir(self.root_dir):
+            path_to_entry = self.get_path(key)
+            if key.endswith(".tmp") or not os.path.isdir(path_to_entry):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path_to_entry))
+            entries.append((os.stat(path_to_entry).st_mtime, key, size))
+
+        return sorted(entries)
+
+    def get_size(self):
+        return sum(size for _, _, size in self._get_entries())
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until the cache fits into max_bytes."""
+        entries = self._get_entries()
+        total_size = sum(size for _, _, size in entries)
+
+        for _, key, size in entries:
+            if total_size <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.get_path(key), ignore_errors=True)
+            total_size -= size
+
+    def get_matrices_key(self, store, symbols, interval, year_months, columns=("close", "volume")):
+        """Return the key of the matrices of the given store columns. No symbols or months stands for all
+           of them, which the store fingerprint covers."""
+        return self.get_key("matrices", store.get_fingerprint(symbols, interval, year_months),
+                            sorted(symbols) if symbols is not None else None, interval,
+                            sorted(year_months) if year_months is not None else None, list(columns))
+
+    def get_matrices(self, store, symbols, interval, year_months, columns=("close", "volume")):
+        """Return the aligned matrices of the given store columns, building and caching them on the first call.
+           Return None when the store holds no matching data."""
+        key = self.get_matrices_key(store, symbols, interval, year_months, columns)
+        matrices = self.get(key)
+        if matrices is not None:
+            return matrices
+
+        data_frame = store.read(symbols=symbols, interval=interval, year_months=year_months, columns=columns)
+        if data_frame.empty:
+            return None
+        self.put(key, {column: DataLoader.pivot(data_frame, column) for column in columns})
+
+        return self.get(key)
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from core import engine
+from core.data_loader import DataLoader
+from core.instrumentation import stage_tracker
+from core.metrics import MetricsAccumulator
+from core.reporting import save_csv
+from core.resample import INTERVAL_FREQS
+from strategies.indicators import IndicatorCache
+
+
+class ChunkedBacktester:
+    """ChunkedBacktester class backtests a strategy over stored data that doesn't fit in memory, in two passes.
+       First the signals are generated for symbols_per_chunk pairs at a time over their whole history (the
+       indicators depend on all earlier bars of a pair: expanding means, EMAs, held positions) and spilled
+       to disk by month together with the close. Then the portfolio runs month by month over all pairs with
+       the compiled engine, carrying the cash, the open positions and the last prices from one month to the
+       next, and the metrics are merged chunk by chunk. The memory stays bounded by one symbol batch or one
+       month of all pairs, and the results match a Backtester run over the whole frame with the numba engine."""
+    RESULT_DIR = "results"
+
+    def __init__(self, store, strategy_class, params=None, symbols=None, interval="1m", year_months=None,
+                 symbols_per_chunk=10, fees=0.0, slippage=0.0, stop_loss=0.0, take_profit=0.0, size=1.0,
+                 init_cash=100.0, work_dir=None):
+        self.store = store
+        self.strategy_class = strategy_class
+        self.params = params or {}
+        self.symbols = symbols
+        self.interval = interval
+        self.year_months = year_months
+        self.symbols_per_chunk = symbols_per_chunk
+        self.fees = fees
+        self.slippage = slippage
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.size = size
+        self.init_cash = init_cash
+        self.work_dir = work_dir
+
+    def get_symbols(self):
+        manifest = self.store.get_manifest()
+        manifest = manifest[manifest["interval"] == self.interval]
+        if self.symbols is not None:
+            manifest = manifest[manifest["symbol"].isin(self.symbols)]
+        if self.year_months is not None:
+            manifest = manifest[manifest["year_month"].isin(self.year_months)]
+
+        return sorted(manifest["symbol"].unique())
+
+    def iter_symbol_batches(self, symbols):
+        """Yield the full history of symbols_per_chunk pairs at a time, with the columns the strategy needs."""
+        columns = list(self.strategy_class.REQUIRED_COLUMNS) + ["year_month"]
+        for start in range(0, len(symbols), self.symbols_per_chunk):
+            yield self.store.read(symbols[start:start + self.symbols_per_chunk], self.interval, self.year_months,
+                                  columns=columns)
+
+    def write_signals(self, work_dir, symbols):
+        """Pass one: generate the signals of every symbol batch and spill them with the close by month."""
+        for batch_number, price_data in enumerate(self.iter_symbol_batches(symbols)):
+            with stage_tracker.stage("chunked.signals", rows=len(price_data)):
+                # A cache of its own per batch, so the indicators of a batch are freed with it
+                strategy = self.strategy_class(price_data, indicator_cache=IndicatorCache(), **self.params)
+                spill = pd.DataFrame({
+                    "timestamp": price_data["timestamp"],
+                    "symbol": price_data["symbol"],
+                    "close": price_data["close"].astype("float64"),
+                    "signal": strategy.get_signals()["signal"].astype(bool)
+                })
+                for year_month, part in spill.groupby(price_data["year_month"], sort=False):
+                    path_to_part = os.path.join(work_dir, f"year_month={year_month}",
+                                                f"batch-{batch_number:05d}.parquet")
+                    os.makedirs(os.path.dirname(path_to_part), exist_ok=True)
+                    pq.write_table(pa.Table.from_pandas(part, preserve_index=False), path_to_part)
+
+    @staticmethod
+    def iter_time_chunks(work_dir, symbols):
+        """Yield the aligned (timestamp x symbol) close and signal matrices of every month in time order."""
+        for month_dir in sorted(os.listdir(work_dir)):
+            chunk = ds.dataset(os.path.join(work_dir, month_dir), format="parquet").to_table().to_pandas()
+            close = DataLoader.pivot(chunk, "close").reindex(columns=symbols)
+            signal = DataLoader.pivot(chunk, "signal").reindex_like(close).fillna(False).astype(bool)
+            yield close, signal
+
+    def run(self):
+        """Run the backtest and return a frame of per-symbol metrics."""
+        symbols = self.get_symbols()
+        if not symbols:
+            raise ValueError(f"The store has no {self.interval} data for the requested symbols and months.")
+
+        state = engine.create_state(len(symbols), self.init_cash)
+        accumulator = MetricsAccumulator(len(symbols), self.init_cash, INTERVAL_FREQS[self.interval])
+        row_offset = 0
+
+        with tempfile.TemporaryDirectory(dir=self.work_dir) as work_dir:
+            self.write_signals(work_dir, symbols)
+
+            # Pass two: the portfolio state and the metrics are carried from one month to the next
+            for close, signal in self.iter_time_chunks(work_dir, symbols):
+                with stage_tracker.stage("chunked.portfolio", rows=close.size):
+                    # Carry the last known price of every pair over missing bars, across the month boundary too
+                    close = close.ffill().fillna(pd.Series(state.last_price, index=close.columns))
+                    equity, trades, bars_in_position = engine.simulate_chunk(
+                        close.to_numpy(), signal.to_numpy(), state, row_offset, fees=self.fees,
+                        slippage=self.slippage, stop_loss=self.stop_loss, take_profit=self.take_profit,
+                        size=self.size)
+                    accumulator.update(equity, trades[:, 0], trades[:, 7], bars_in_position)
+                    row_offset += len(close)
+
+        return accumulator.get_metrics(pd.Index(symbols, name="symbol"))
+
+    def save(self, symbol_metrics: pd.DataFrame, file_name="chunked_metrics.csv"):
+        return save_csv(symbol_metrics, self.RESULT_DIR, file_name)
@@ -1,26 +1,148 @@
 import os
+import json
+import time
+import hashlib
 import logging
 import zipfile
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from core.instrumentation import stage_tracker
+
+
+KLINE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "close_time", "quote_asset_volume",
+                 "number_of_trades", "taker_buy_base_asset_volume", "taker_buy_quote_asset_volume", "ignore"]
+# Compact dtypes for the kline columns; the 'ignore' column is never loaded
+KLINE_DTYPES = {
+    "timestamp": "int64",
+    "open": "float32",
+    "high": "float32",
+    "low": "float32",
+    "close": "float32",
+    "volume": "float64",
+    "close_time": "int64",
+    "quote_asset_volume": "float64",
+    "number_of_trades": "int64",
+    "taker_buy_base_asset_volume": "float64",
+    "taker_buy_quote_asset_volume": "float64"
+}
+
+
+def parse_kline_name(path):
+    """Split a Binance kline file name like 'ETHBTC-1m-2025-02.csv' into (symbol, interval, year_month)."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    symbol, interval, year_month = name.split("-", 2)
+
+    return symbol, interval, year_month
+
+
+def epoch_to_datetime(timestamps):
+    """Convert Binance epoch timestamps to datetimes. Spot archives switched from milliseconds
+       to microseconds in 2025, so the unit is detected from the magnitude of the values."""
+    timestamps = pd.Series(timestamps)
+    unit = "us" if len(timestamps) and timestamps.max() > 10 ** 14 else "ms"
+
+    return pd.to_datetime(timestamps, unit=unit)
+
+
+def read_klines(file_obj):
+    """Parse a Binance kline CSV from a path or an open file object into a frame with compact dtypes
+       and datetime 'timestamp'/'close_time' columns."""
+    data_frame = pd.read_csv(file_obj, header=None, names=KLINE_COLUMNS, usecols=list(KLINE_DTYPES),
+                             dtype=KLINE_DTYPES)
+    data_frame["timestamp"] = epoch_to_datetime(data_frame["timestamp"])
+    data_frame["close_time"] = epoch_to_datetime(data_frame["close_time"])
+
+    return data_frame
 
 
 class JsonLoader:
-    """JsonLoader class return a json response based on the given url."""
-    def __init__(self, url):
+    """JsonLoader class return a json response based on the given url.
+       With a cache_dir every response is kept on disk with its ETag and reused for ttl seconds. After that
+       the request is made conditional, so an unchanged payload is not downloaded again, and the cached
+       response is still used when the exchange can't be reached. The offline mode only reads the cache."""
+    def __init__(self, url, cache_dir=None, ttl=3600, offline=False):
         self.url = url
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.offline = offline
+
+    def get_cache_path(self, url):
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(url.encode()).hexdigest()[:32]}.json")
+
+    def _load_cached(self, url):
+        try:
+            with open(self.get_cache_path(url)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_cached(self, url, entry):
+        # Replace the entry atomically so a crash never leaves it half written
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path_to_cache = self.get_cache_path(url)
+        with open(f"{path_to_cache}.tmp", "w") as f:
+            json.dump(entry, f)
+        os.replace(f"{path_to_cache}.tmp", path_to_cache)
 
     def get_json(self, path=None):
         url = path if path is not None else self.url
-        response = requests.get(url)
-
-        return response.json()
+        if self.cache_dir is None:
+            with stage_tracker.stage("json.get", url=url) as event:
+                response = requests.get(url)
+                event["bytes"] = len(response.content)
+
+                return response.json()
+
+        return self._get_cached_json(url)
+
+    def _get_cached_json(self, url):
+        entry = self._load_cached(url)
+        if entry is not None and (self.offline or time.time() - entry["fetched_at"] < self.ttl):
+            return entry["data"]
+        if self.offline:
+            raise LookupError(f"No cached response for {url} in the offline mode.")
+
+        # Ask the exchange to answer 304 Not Modified if the cached payload is still current
+        headers = {}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        with stage_tracker.stage("json.get", url=url, conditional=bool(headers)) as event:
+            try:
+                response = requests.get(url, headers=headers, timeout=30)
+                if entry is not None and response.status_code == 304:
+                    event["bytes"] = 0
+                    entry["fetched_at"] = time.time()
+                    self._save_cached(url, entry)
+                    return entry["data"]
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                if entry is None:
+                    raise
+                logging.warning(f"Request to {url} failed ({e}), using the cached response.")
+                return entry["data"]
+
+            event["bytes"] = len(response.content)
+            entry = {
+                "url": url,
+                "fetched_at": time.time(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "data": response.json()
+            }
+            self._save_cached(url, entry)
+
+            return entry["data"]
 
 
 class TradingPairsLoader(JsonLoader):
     """TradingPairsLoader class extends JsonLoader with the ability to form a list of trading pairs."""
-    def __init__(self, url, quote_asset):
-        super().__init__(url)
+    def __init__(self, url, quote_asset, cache_dir=None, ttl=3600, offline=False):
+        super().__init__(url, cache_dir, ttl, offline)
         self.quote_asset = quote_asset
 
     def get_pairs(self):
@@ -37,19 +159,19 @@ class TradingPairsLoader(JsonLoader):
 class TopLiquidLoader(TradingPairsLoader):
     """TopLiquidLoader class extends TradingPairsLoader by adding the capability to generate a list of dictionaries
        containing the keys 'pair' and 'volume' for the most liquid trading pairs based on the last 24 hours."""
-    def __init__(self, url, quote_asset):
-        super().__init__(url, quote_asset)
+    def __init__(self, url, quote_asset, cache_dir=None, ttl=3600, offline=False):
+        super().__init__(url, quote_asset, cache_dir, ttl, offline)
         self.quote_asset = quote_asset
 
     def get_top_liquid(self, actual_trades_url, top_liquid_number=100):
-        # Get all quoteAsset trading pairs
-        trading_pairs = self.get_pairs()
+        # Get all quoteAsset trading pairs as a set for constant time lookups
+        trading_pairs = set(self.get_pairs())
         # Get all quoteAsset trading pairs with volumes for the last 24 hours
         all_24h_data = self.get_json(actual_trades_url)
-        print(f"trading_pairs: {trading_pairs}")
+        logging.info(f"{len(trading_pairs)} {self.quote_asset} trading pairs found.")
         actual_pairs_volumes = [
             {"pair": ticker["symbol"], "volume": float(ticker["quoteVolume"])}
-            for ticker in filter(lambda ticker: ticker["symbol"] in trading_pairs, all_24h_data)
+            for ticker in all_24h_data if ticker["symbol"] in trading_pairs
         ]
         # Sort all trading pairs from highest to lowest volume
         actual_pairs_volumes.sort(key=lambda ticker: ticker["volume"], reverse=True)
@@ -58,13 +180,124 @@ class TopLiquidLoader(TradingPairsLoader):
 
 
 class CsvLoader():
-    """CsvLoader class downloads the needed archive with OHLCV information and unzip it."""
+    """CsvLoader class downloads the needed archive with OHLCV information and unzip it.
+       The bulk mode downloads many pairs, intervals and months concurrently over one pooled session,
+       streams every archive to disk, verifies it against the Binance .CHECKSUM file and skips
+       archives that are already downloaded and verified."""
     DATA_DIR = "data"
+    CHUNK_SIZE = 1024 * 1024
 
-    def __init__(self, base_ohlcv_url):
+    def __init__(self, base_ohlcv_url, max_workers=8, retries=3, backoff=0.5):
         self.base_ohlcv_url = base_ohlcv_url
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
         os.makedirs(self.DATA_DIR, exist_ok=True)
 
+    def get_zip_url(self, pair, ohlcv_period, year_month):
+        return f"{self.base_ohlcv_url}{pair}/{ohlcv_period}/{pair}-{ohlcv_period}-{year_month}.zip"
+
+    def _create_session(self):
+        # One connection pool shared by all worker threads
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        return session
+
+    @classmethod
+    def _sha256(cls, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_checksum(path_to_checksum):
+        # The .CHECKSUM file has the sha256sum format: "<hex digest>  <file name>"
+        with open(path_to_checksum) as f:
+            return f.read().split()[0].lower()
+
+    def is_downloaded(self, path_to_zip):
+        # An archive counts as downloaded only if it matches the checksum saved next to it
+        path_to_checksum = f"{path_to_zip}.CHECKSUM"
+        if not (os.path.exists(path_to_zip) and os.path.exists(path_to_checksum)):
+            return False
+
+        return self._sha256(path_to_zip) == self._read_checksum(path_to_checksum)
+
+    def _stream_to_file(self, session, url, path):
+        # Stream the response into a temporary file, so an interrupted download never looks complete
+        path_to_part = f"{path}.part"
+        with stage_tracker.stage("csv.download", url=url) as event, session.get(url, stream=True, timeout=60) as r:
+            r.raise_for_status()
+            downloaded_bytes = 0
+            with open(path_to_part, "wb") as f:
+                for chunk in r.iter_content(chunk_size=self.CHUNK_SIZE):
+                    f.write(chunk)
+                    downloaded_bytes += len(chunk)
+            event["bytes"] = downloaded_bytes
+        os.replace(path_to_part, path)
+
+    def _download_verified(self, session, pair, ohlcv_period, year_month):
+        download_url = self.get_zip_url(pair, ohlcv_period, year_month)
+        path_to_zip = os.path.join(self.DATA_DIR, os.path.basename(download_url))
+
+        if self.is_downloaded(path_to_zip):
+            return path_to_zip
+
+        for attempt in range(self.retries + 1):
+            try:
+                self._stream_to_file(session, f"{download_url}.CHECKSUM", f"{path_to_zip}.CHECKSUM")
+                self._stream_to_file(session, download_url, path_to_zip)
+                if self.is_downloaded(path_to_zip):
+                    return path_to_zip
+                error = ValueError(f"checksum mismatch for {path_to_zip}")
+            except requests.exceptions.HTTPError as e:
+                # Missing archives (e.g. a pair listed after the month) are not worth retrying
+                if e.response is not None and e.response.status_code == 404:
+                    raise
+                error = e
+            except requests.exceptions.RequestException as e:
+                error = e
+
+            if attempt < self.retries:
+                time.sleep(self.backoff * 2 ** attempt)
+
+        raise error
+
+    def bulk_download(self, pairs, ohlcv_periods, year_months):
+        """Download the archives of every (pair, period, month) combination and return a dict
+           mapping the combination to the path of its verified zip. Failed downloads are reported and skipped."""
+        jobs = [(pair, ohlcv_period, year_month)
+                for pair in pairs for ohlcv_period in ohlcv_periods for year_month in year_months]
+        paths_to_zips = {}
+
+        with stage_tracker.stage("csv.bulk_download", jobs=len(jobs)), self._create_session() as session, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._download_verified, session, *job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    paths_to_zips[job] = future.result()
+                except Exception as e:
+                    print(f"Error while downloading zip for {'-'.join(job)}: {e}")
+
+        return paths_to_zips
+
+    @staticmethod
+    def read_ohlcv_zip(path_to_zip):
+        # Parse the CSV member straight from the archive without extracting it to disk
+        with zipfile.ZipFile(path_to_zip, "r") as zf:
+            csv_names = [name for name in zf.namelist() if name.endswith(".csv")]
+            if not csv_names:
+                raise ValueError(f"{path_to_zip} has no CSV file.")
+            with zf.open(csv_names[0]) as csv_file:
+                return read_klines(csv_file)
+
     def download_ohlcv_zip(self, pair, ohlcv_period, year_month):
         # Generate URL to download the archive
         download_url = f"{self.base_ohlcv_url}{pair}/{ohlcv_period}/{pair}-{ohlcv_period}-{year_month}.zip"
@@ -101,8 +334,9 @@ class CsvLoader():
 
 
 class DataLoader():
-    """DataLoader class loads data for all trading pairs and combines them into a single DataFrame.
-       Information about all steps is saved in the log file."""
+    """DataLoader class loads data for all trading pairs and combines them into a single DataFrame
+       tagged with a 'symbol' column. The paths may point to extracted CSV files or straight to the
+       downloaded zip archives. Information about all steps is saved in the log file."""
     DATA_DIR = "data"
     LOG_FILE = "data/data_loader.log"
 
@@ -116,16 +350,15 @@ class DataLoader():
                             format="%(asctime)s - %(levelname)s - %(message)s")
         logging.info("DataLoader initialized.")
 
-    def create_parquet(self, parquet_name):
-        data_frames_list = []
-
-        for csv_path in self.pairs_csv_paths:
+    def load_frame(self, csv_path):
+        """Load one pair from a CSV or zip path. Return None if the data is missing or broken."""
+        with stage_tracker.stage("data.load_frame", path=csv_path) as event:
             try:
-                # Loade CSV into pandas DataFrame
-                data_frame = pd.read_csv(csv_path, header=None,
-                                 names=["timestamp", "open", "high", "low", "close", "volume", "close_time",
-                                        "quote_asset_volume", "number_of_trades", "taker_buy_base_asset_volume",
-                                        "taker_buy_quote_asset_volume", "ignore"])
+                # Load CSV, or the CSV inside the archive, into pandas DataFrame
+                if csv_path.endswith(".zip"):
+                    data_frame = CsvLoader.read_ohlcv_zip(csv_path)
+                else:
+                    data_frame = read_klines(csv_path)
 
                 logging.info(f"Successfully loaded {csv_path}.")
 
@@ -133,25 +366,76 @@ class DataLoader():
                 mandatory_columns_mask = data_frame[["timestamp", "open", "high", "low", "close", "volume"]].isnull()
                 if mandatory_columns_mask.any().any():
                     logging.warning(f"Warning: Missing values found in {csv_path}, skipping.")
-                    continue
+                    return None
 
-                # Add a DataFrame to the list
-                data_frames_list.append(data_frame)
+                # Tag every row with its trading pair so the pairs can be separated again later
+                data_frame["symbol"] = parse_kline_name(csv_path)[0]
+                event["rows"] = len(data_frame)
+                event["bytes"] = os.path.getsize(csv_path)
+
+                return data_frame
 
             except Exception as e:
                 logging.error(f"Error loading {csv_path}: {e}")
-                continue
+                event["error"] = repr(e)
+                return None
+
+    def update_store(self, store, overwrite=False):
+        """Append every loaded pair and month to the partitioned store, skipping the partitions it already has.
+           Return the list of written partition keys."""
+        written_keys = []
+
+        with stage_tracker.stage("data.update_store", files=len(self.pairs_csv_paths)) as event:
+            for csv_path in self.pairs_csv_paths:
+                symbol, interval, year_month = parse_kline_name(csv_path)
+                if store.has_partition(symbol, interval, year_month) and not overwrite:
+                    logging.info(f"Partition {store.get_key(symbol, interval, year_month)} is already stored.")
+                    continue
 
-        if not data_frames_list:
-            logging.error("Exit - no valid data to process.")
-            return None
+                data_frame = self.load_frame(csv_path)
+                if data_frame is None:
+                    continue
 
-        # Merge all DataFrames into one
-        merged_data_frames = pd.concat(data_frames_list, ignore_index=True)
-        # Save the merged DataFrame as a parquet file with compression
-        path_to_parquet = os.path.join(self.DATA_DIR, f"{parquet_name}.parquet")
-        merged_data_frames.to_parquet(path_to_parquet, compression="snappy")
+                store.write_partition(data_frame, symbol, interval, year_month, overwrite=overwrite)
+                written_keys.append(store.get_key(symbol, interval, year_month))
+                logging.info(f"Data of {csv_path} saved to the store {store.root_dir}.")
+            event["partitions"] = len(written_keys)
 
-        logging.info(f"Data successfully merged and saved to {path_to_parquet}.")
+        return written_keys
 
-        return merged_data_frames
+    def create_parquet(self, parquet_name):
+        with stage_tracker.stage("data.create_parquet", files=len(self.pairs_csv_paths)) as event:
+            data_frames_list = []
+
+            for csv_path in self.pairs_csv_paths:
+                data_frame = self.load_frame(csv_path)
+
+                # Add a DataFrame to the list
+                if data_frame is not None:
+                    data_frames_list.append(data_frame)
+
+            if not data_frames_list:
+                logging.error("Exit - no valid data to process.")
+                return None
+
+            # Merge all DataFrames into one
+            merged_data_frames = pd.concat(data_frames_list, ignore_index=True)
+            event["rows"] = len(merged_data_frames)
+            # Save the merged DataFrame as a parquet file with compression
+            path_to_parquet = os.path.join(self.DATA_DIR, f"{parquet_name}.parquet")
+            merged_data_frames.to_parquet(path_to_parquet, compression="snappy")
+
+            logging.info(f"Data successfully merged and saved to {path_to_parquet}.")
+
+            return merged_data_frames
+
+    @staticmethod
+    def pivot(data_frame, column="close"):
+        """Turn a symbol-tagged long frame into an aligned (timestamp x symbol) matrix of the given column."""
+        wide = data_frame.pivot(index="timestamp", columns="symbol", values=column)
+        if not pd.api.types.is_datetime64_any_dtype(wide.index):
+            wide.index = pd.DatetimeIndex(epoch_to_datetime(wide.index.to_numpy()))
+        wide.index.name = "timestamp"
+        wide.columns.name = "symbol"
+
+        return wide
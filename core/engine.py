@@ -0,0 +1,149 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from numba import njit
+
+# Version of the simulation semantics, part of the key of stored results: bump it when the results change
+ENGINE_VERSION = "1"
+
+# The kernels are compiled with cache=True, so the machine code is kept in __pycache__ and later processes
+# load it instead of compiling again
+
+# Result of a simulation: the equity curve of every column, the closed trades of all columns
+# and the fraction of bars every column spent in a position
+SimulationResult = namedtuple("SimulationResult", ["equity", "trades", "exposure"])
+
+TRADE_COLUMNS = ["column", "entry_index", "exit_index", "entry_price", "exit_price", "size", "pnl", "return"]
+
+# Portfolio state of every column carried from one chunk of a series to the next
+PortfolioState = namedtuple("PortfolioState", ["cash", "units", "entry_index", "entry_price", "entry_cost",
+                                               "last_price"])
+
+
+@njit(nogil=True, cache=True)
+def simulate_chunk_nb(close, entries, exits, fees, slippage, stop_loss, take_profit, size, row_offset,
+                      cash, units, entry_index, entry_price, entry_cost, last_price):
+    """Run every column of the (time x column) arrays bar by bar. Orders fill at the close of the signal bar,
+       moved against the trader by slippage, and pay fees on the order value. An open position is closed by
+       an exit signal or when the close hits the stop-loss or take-profit level relative to the entry price.
+       size is the fraction of the available cash invested on every entry.
+       The portfolio state of every column (cash, units, entry index/price/cost and the last price) is read
+       from the state arrays and written back to them, so a long series can be run chunk by chunk;
+       row_offset is the position of the first row of the chunk in the whole series.
+       Return the equity, the closed trades and the number of bars in a position of every column."""
+    n_rows, n_columns = close.shape
+    equity = np.empty((n_rows, n_columns), dtype=np.float64)
+    trades = np.empty((n_rows // 2 * n_columns + n_columns, 8), dtype=np.float64)
+    bars_in_position = np.zeros(n_columns, dtype=np.float64)
+    n_trades = 0
+
+    for column in range(n_columns):
+        for row in range(n_rows):
+            price = close[row, column]
+            if np.isnan(price):
+                equity[row, column] = (cash[column] + units[column] * last_price[column] if units[column] > 0
+                                       else cash[column])
+                continue
+            last_price[column] = price
+
+            if units[column] > 0:
+                stop_hit = stop_loss > 0 and price <= entry_price[column] * (1 - stop_loss)
+                take_hit = take_profit > 0 and price >= entry_price[column] * (1 + take_profit)
+                if exits[row, column] or stop_hit or take_hit:
+                    exit_price = price * (1 - slippage)
+                    proceeds = units[column] * exit_price * (1 - fees)
+                    cash[column] += proceeds
+                    trades[n_trades, 0] = column
+                    trades[n_trades, 1] = entry_index[column]
+                    trades[n_trades, 2] = row_offset + row
+                    trades[n_trades, 3] = entry_price[column]
+                    trades[n_trades, 4] = exit_price
+                    trades[n_trades, 5] = units[column]
+                    trades[n_trades, 6] = proceeds - entry_cost[column]
+                    trades[n_trades, 7] = (proceeds - entry_cost[column]) / entry_cost[column]
+                    n_trades += 1
+                    units[column] = 0.0
+            elif entries[row, column] and not exits[row, column] and cash[column] > 0:
+                entry_price[column] = price * (1 + slippage)
+                entry_cost[column] = cash[column] * size
+                units[column] = entry_cost[column] / (entry_price[column] * (1 + fees))
+                cash[column] -= entry_cost[column]
+                entry_index[column] = row_offset + row
+
+            equity[row, column] = cash[column] + units[column] * price
+            if units[column] > 0:
+                bars_in_position[column] += 1
+
+    return equity, trades[:n_trades], bars_in_position
+
+
+@njit(nogil=True, cache=True)
+def simulate_nb(close, entries, exits, init_cash, fees, slippage, stop_loss, take_profit, size):
+    """Run the whole series in one chunk from a fresh portfolio, see simulate_chunk_nb.
+       The exposure is returned as the fraction of bars spent in a position."""
+    n_rows, n_columns = close.shape
+    equity, trades, bars_in_position = simulate_chunk_nb(
+        close, entries, exits, fees, slippage, stop_loss, take_profit, size, 0,
+        np.full(n_columns, init_cash), np.zeros(n_columns), np.full(n_columns, -1.0), np.full(n_columns, np.nan),
+        np.zeros(n_columns), np.full(n_columns, np.nan))
+
+    return equity, trades, bars_in_position / max(n_rows, 1)
+
+
+def _to_2d(values):
+    values = np.asarray(values)
+    return values.reshape(-1, 1) if values.ndim == 1 else values
+
+
+def simulate(close, entries, exits=None, init_cash=100.0, fees=0.0, slippage=0.0, stop_loss=0.0, take_profit=0.0,
+             size=1.0):
+    """Simulate the signals over a close series or (time x column) matrix with the compiled kernel.
+       Without exits the position is held exactly while entries is set. Return a SimulationResult."""
+    entries = np.asarray(_to_2d(entries), dtype=np.bool_)
+    exits = ~entries if exits is None else np.asarray(_to_2d(exits), dtype=np.bool_)
+    close_values = np.asarray(_to_2d(close), dtype=np.float64)
+
+    equity, trades, exposure = simulate_nb(close_values, entries, exits, float(init_cash), float(fees),
+                                           float(slippage), float(stop_loss), float(take_profit), float(size))
+
+    # Label the results like the input
+    index = close.index if isinstance(close, (pd.Series, pd.DataFrame)) else None
+    if isinstance(close, pd.DataFrame):
+        columns = close.columns
+    elif isinstance(close, pd.Series):
+        columns = pd.Index([close.name])
+    else:
+        columns = None
+    equity = pd.DataFrame(equity, index=index, columns=columns)
+    trades = pd.DataFrame(trades, columns=TRADE_COLUMNS).astype(
+        {"column": np.int64, "entry_index": np.int64, "exit_index": np.int64})
+
+    return SimulationResult(equity, trades, exposure)
+
+
+def create_state(n_columns, init_cash=100.0):
+    """Return the state of n_columns portfolios holding only cash."""
+    return PortfolioState(np.full(n_columns, float(init_cash)), np.zeros(n_columns), np.full(n_columns, -1.0),
+                          np.full(n_columns, np.nan), np.zeros(n_columns), np.full(n_columns, np.nan))
+
+
+def simulate_chunk(close, entries, state, row_offset=0, exits=None, fees=0.0, slippage=0.0, stop_loss=0.0,
+                   take_profit=0.0, size=1.0):
+    """Simulate the next (time x column) chunk of a series from the portfolio state left by the previous one.
+       The state is updated in place. Return the equity, the closed trades and the bars in a position
+       of every column as arrays; trade indices count rows from the start of the whole series."""
+    entries = np.asarray(_to_2d(entries), dtype=np.bool_)
+    exits = ~entries if exits is None else np.asarray(_to_2d(exits), dtype=np.bool_)
+
+    return simulate_chunk_nb(np.asarray(_to_2d(close), dtype=np.float64), entries, exits, float(fees),
+                             float(slippage), float(stop_loss), float(take_profit), float(size), int(row_offset),
+                             *state)
+
+
+def warm_up():
+    """Compile the kernels for the argument types used by simulate and simulate_chunk and write them
+       to the on-disk cache, so the first backtest of a new process doesn't wait for the compiler."""
+    close = np.ones((2, 1))
+    entries = np.zeros((2, 1), dtype=np.bool_)
+    simulate(close, entries)
+    simulate_chunk(close, entries, create_state(1))
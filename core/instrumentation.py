@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # The resource module only exists on Unix
+    resource = None
+
+
+def get_max_rss_mb():
+    """Return the high-water mark of the resident memory of the process in MB, or None if it is unknown."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StageTracker:
+    """StageTracker class records the stages of a run as structured events. Every stage is timed and tagged
+       with the rows and bytes it processed and the memory high-water marks, and the events are appended
+       to a JSON-lines file as they happen, so even a crashed run leaves them behind. Stages may be nested
+       and run in several threads. The tracker is disabled by default, and then a stage costs nothing."""
+    EVENTS_FILE = "events.jsonl"
+    SUMMARY_FILE = "stage_summary.csv"
+    PROFILE_FILE = "profile.txt"
+
+    def __init__(self):
+        self.enabled = False
+        self.events_path = None
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiler = None
+        self._trace_memory = False
+
+    def enable(self, events_path=os.path.join("results", EVENTS_FILE), profile=False, trace_memory=False):
+        """Start recording into events_path. profile runs cProfile over the calling thread and trace_memory
+           adds the peak of the memory traced by tracemalloc to every event."""
+        self.enabled = True
+        self.events_path = events_path
+        self.events = []
+        if events_path is not None:
+            os.makedirs(os.path.dirname(events_path) or ".", exist_ok=True)
+            open(events_path, "w").close()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._trace_memory = True
+        if profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def disable(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler = None
+        if self._trace_memory:
+            tracemalloc.stop()
+            self._trace_memory = False
+        self.enabled = False
+
+    def _get_stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """Record the enclosed block as a stage. The yielded dict takes extra fields like 'rows' or 'bytes'."""
+        if not self.enabled:
+            yield {}
+            return
+
+        stack = self._get_stack()
+        event = {"stage": name, "parent": stack[-1] if stack else None, "thread": threading.current_thread().name,
+                 **fields}
+        stack.append(name)
+        event["start"] = time.time()
+        start = time.perf_counter()
+        try:
+            yield event
+        except Exception as e:
+            event["error"] = repr(e)
+            raise
+        finally:
+            event["seconds"] = time.perf_counter() - start
+            event["max_rss_mb"] = get_max_rss_mb()
+            if tracemalloc.is_tracing():
+                event["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            stack.pop()
+            self._record(event)
+
+    def _record(self, event):
+        with self._lock:
+            self.events.append(event)
+            if self.events_path is not None:
+                with open(self.events_path, "a") as f:
+                    f.write(json.dumps(event, default=str) + "\n")
+
+    def get_summary(self):
+        """Return a frame with a row per stage name: the number of calls, the total, mean and longest time,
+           the processed rows and bytes and the highest memory marks, slowest stages first."""
+        import pandas as pd
+
+        events = pd.DataFrame(self.events)
+        if events.empty:
+            return pd.DataFrame()
+        for column in ("rows", "bytes", "max_rss_mb", "traced_peak_mb"):
+            if column not in events.columns:
+                events[column] = float("nan")
+
+        summary = events.groupby("stage").agg(
+            calls=("seconds", "size"),
+            total_seconds=("seconds", "sum"),
+            mean_seconds=("seconds", "mean"),
+            max_seconds=("seconds", "max"),
+            rows=("rows", "sum"),
+            bytes=("bytes", "sum"),
+            max_rss_mb=("max_rss_mb", "max"),
+            traced_peak_mb=("traced_peak_mb", "max")
+        )
+
+        return summary.sort_values("total_seconds", ascending=False)
+
+    def save_summary(self, result_dir="results"):
+        """Save the stage summary and, in the profiling mode, the cProfile report to result_dir.
+           Return the paths to the written files."""
+        os.makedirs(result_dir, exist_ok=True)
+        paths = [os.path.join(result_dir, self.SUMMARY_FILE)]
+        self.get_summary().to_csv(paths[0])
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            paths.append(os.path.join(result_dir, self.PROFILE_FILE))
+            with open(paths[-1], "w") as f:
+                pstats.Stats(self._profiler, stream=f).sort_stats("cumulative").print_stats(50)
+            self._profiler.enable()
+
+        return paths
+
+
+# Tracker shared by the whole pipeline
+stage_tracker = StageTracker()
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ["total_return", "sharpe_ratio", "max_drawdown", "winrate", "expectancy", "exposure_time",
+                  "total_trades"]
+
+
+def get_bars_per_year(freq="1min"):
+    return pd.Timedelta(days=365) / pd.Timedelta(freq)
+
+
+def compute_metrics(equity, trade_columns=None, trade_returns=None, exposure=None, init_cash=None, freq="1min"):
+    """Compute the metrics of every column of a (time x column) equity matrix at once.
+       Trades are given as two flat arrays: the column of every trade and its return. exposure is the fraction
+       of bars spent in a position per column. Columns without trades get a zero winrate and expectancy.
+       Return a frame with a row per column."""
+    columns = equity.columns if isinstance(equity, pd.DataFrame) else None
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.ndim == 1:
+        equity = equity.reshape(-1, 1)
+    n_columns = equity.shape[1]
+    init_cash = equity[0] if init_cash is None else np.broadcast_to(np.asarray(init_cash, dtype=np.float64),
+                                                                    (n_columns,))
+
+    # Bar returns, the first one relative to the initial cash
+    previous_equity = np.vstack([init_cash, equity[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity / previous_equity - 1
+        sharpe_ratio = returns.mean(axis=0) / returns.std(axis=0, ddof=1) * np.sqrt(get_bars_per_year(freq))
+        max_drawdown = (equity / np.maximum.accumulate(equity, axis=0) - 1).min(axis=0)
+
+    # Trade statistics counted per column in one pass over the flat trade arrays
+    if trade_columns is None:
+        trade_columns, trade_returns = np.empty(0, dtype=np.int64), np.empty(0)
+    trade_columns = np.asarray(trade_columns, dtype=np.int64)
+    trade_returns = np.asarray(trade_returns, dtype=np.float64)
+    total_trades = np.bincount(trade_columns, minlength=n_columns)
+    win_trades = np.bincount(trade_columns, weights=trade_returns > 0, minlength=n_columns)
+    return_sum = np.bincount(trade_columns, weights=trade_returns, minlength=n_columns)
+    has_trades = total_trades > 0
+
+    return pd.DataFrame({
+        "total_return": equity[-1] / init_cash - 1,
+        "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown,
+        "winrate": np.divide(win_trades, total_trades, out=np.zeros(n_columns), where=has_trades),
+        "expectancy": np.divide(return_sum, total_trades, out=np.zeros(n_columns), where=has_trades),
+        "exposure_time": np.zeros(n_columns) if exposure is None else np.asarray(exposure, dtype=np.float64),
+        "total_trades": total_trades
+    }, index=columns)
+
+
+def compute_simulation_metrics(result, init_cash=100.0, freq="1min"):
+    """Compute the metrics of an engine.SimulationResult."""
+    return compute_metrics(result.equity, result.trades["column"].to_numpy(), result.trades["return"].to_numpy(),
+                           result.exposure, init_cash=init_cash, freq=freq)
+
+
+class MetricsAccumulator:
+    """MetricsAccumulator class computes the metrics of compute_metrics over an equity matrix that arrives
+       chunk by chunk in time order. Only running per-column statistics are kept (the return mean and sum of
+       squared deviations merged chunk by chunk, the equity peak and the trade counts), so the memory does not
+       grow with the length of the series."""
+    def __init__(self, n_columns, init_cash=100.0, freq="1min"):
+        self.n_columns = n_columns
+        self.init_cash = np.broadcast_to(np.asarray(init_cash, dtype=np.float64), (n_columns,)).copy()
+        self.freq = freq
+        self.last_equity = self.init_cash.copy()
+        self.peak = np.full(n_columns, -np.inf)
+        self.max_drawdown = np.zeros(n_columns)
+        self.n_rows = 0
+        self.return_mean = np.zeros(n_columns)
+        self.return_squared_deviations = np.zeros(n_columns)
+        self.bars_in_position = np.zeros(n_columns)
+        self.total_trades = np.zeros(n_columns, dtype=np.int64)
+        self.win_trades = np.zeros(n_columns)
+        self.return_sum = np.zeros(n_columns)
+
+    def update(self, equity, trade_columns=None, trade_returns=None, bars_in_position=None):
+        """Add the next chunk: its equity rows, its closed trades as flat column/return arrays
+           and the number of bars every column spent in a position."""
+        equity = np.asarray(equity, dtype=np.float64)
+        if len(equity):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns = equity / np.vstack([self.last_equity, equity[:-1]]) - 1
+                peak = np.maximum(np.maximum.accumulate(equity, axis=0), self.peak)
+                self.max_drawdown = np.minimum(self.max_drawdown, (equity / peak - 1).min(axis=0))
+
+                # Merge the return statistics of the chunk with the ones seen so far
+                n_chunk = len(returns)
+                chunk_mean = returns.mean(axis=0)
+                n_total = self.n_rows + n_chunk
+                delta = chunk_mean - self.return_mean
+                self.return_mean = self.return_mean + delta * n_chunk / n_total
+                self.return_squared_deviations = (self.return_squared_deviations +
+                                                  ((returns - chunk_mean) ** 2).sum(axis=0) +
+                                                  delta ** 2 * self.n_rows * n_chunk / n_total)
+            self.n_rows = n_total
+            self.peak = peak[-1]
+            self.last_equity = equity[-1].copy()
+
+        if trade_columns is not None and len(trade_columns):
+            trade_columns = np.asarray(trade_columns, dtype=np.int64)
+            trade_returns = np.asarray(trade_returns, dtype=np.float64)
+            self.total_trades += np.bincount(trade_columns, minlength=self.n_columns)
+            self.win_trades += np.bincount(trade_columns, weights=trade_returns > 0, minlength=self.n_columns)
+            self.return_sum += np.bincount(trade_columns, weights=trade_returns, minlength=self.n_columns)
+        if bars_in_position is not None:
+            self.bars_in_position += bars_in_position
+
+    def get_metrics(self, columns=None):
+        """Return the metrics of the series seen so far with a row per column, like compute_metrics."""
+        has_trades = self.total_trades > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return_std = np.sqrt(self.return_squared_deviations / (self.n_rows - 1))
+            sharpe_ratio = self.return_mean / return_std * np.sqrt(get_bars_per_year(self.freq))
+
+        return pd.DataFrame({
+            "total_return": self.last_equity / self.init_cash - 1,
+            "sharpe_ratio": sharpe_ratio,
+            "max_drawdown": self.max_drawdown,
+            "winrate": np.divide(self.win_trades, self.total_trades, out=np.zeros(self.n_columns), where=has_trades),
+            "expectancy": np.divide(self.return_sum, self.total_trades, out=np.zeros(self.n_columns),
+                                    where=has_trades),
+            "exposure_time": self.bars_in_position / max(self.n_rows, 1),
+            "total_trades": self.total_trades
+        }, index=columns)
@@ -0,0 +1,168 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+
+def save_csv(data_frame: pd.DataFrame, result_dir: str, file_name: str, index=True):
+    """Write a table to a CSV file in the result directory and return the path to it."""
+    os.makedirs(result_dir, exist_ok=True)
+    path_to_csv = os.path.join(result_dir, file_name)
+    data_frame.to_csv(path_to_csv, index=index)
+
+    return path_to_csv
+
+
+def downsample_lttb(x, y, threshold):
+    """Pick threshold points of the (x, y) line with the Largest-Triangle-Three-Buckets algorithm, which keeps
+       the visual shape of the line. Return the positions of the kept points."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n_points = len(x)
+    if threshold >= n_points or threshold < 3:
+        return np.arange(n_points)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n_points - 1
+    # The points between the first and the last one are split into threshold - 2 buckets
+    edges = np.linspace(1, n_points - 1, threshold - 1).astype(np.int64)
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # The next bucket is represented by its average point
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n_points
+        next_x = x[next_start:next_end].mean()
+        next_y = np.nanmean(y[next_start:next_end]) if np.isfinite(y[next_start:next_end]).any() else y[previous]
+        # Keep the point forming the largest triangle with the previous kept point and the next average
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.nanargmax(areas)) if np.isfinite(areas).any() else start
+        kept[bucket + 1] = previous
+
+    return kept
+
+
+def downsample_minmax(y, buckets):
+    """Keep the minimum and the maximum of every bucket, so spikes survive the downsampling.
+       Return the sorted positions of the kept points."""
+    y = np.asarray(y, dtype=np.float64)
+    if 2 * buckets >= len(y):
+        return np.arange(len(y))
+
+    kept = []
+    for bucket in np.array_split(np.arange(len(y)), buckets):
+        values = y[bucket]
+        if np.isfinite(values).any():
+            kept.extend([bucket[np.nanargmin(values)], bucket[np.nanargmax(values)]])
+
+    return np.unique(kept)
+
+
+class ChartReporter:
+    """ChartReporter class draws backtest charts as a separate stage of the pipeline. Long series are
+       downsampled before drawing, every symbol/parameter set gets its own chart, and in the background mode
+       charts are rendered by a worker thread so backtests never wait for plotting.
+       Figures are created without pyplot, so nothing stays open after a chart is saved."""
+    RESULT_DIR = "results/screenshots"
+    MARKERS = {1: ("^", "b", "Signal to buy"), -1: ("v", "r", "Signal to sell")}
+
+    def __init__(self, result_dir=RESULT_DIR, max_points=2000, background=False, enabled=True):
+        self.result_dir = result_dir
+        self.max_points = max_points
+        self.enabled = enabled
+        self._executor = ThreadPoolExecutor(max_workers=1) if background and enabled else None
+        self._futures = []
+        if self._executor is not None:
+            self.prepare_matplotlib()
+
+    @staticmethod
+    def prepare_matplotlib():
+        """Import matplotlib and create a first canvas on the calling thread. The first canvas of every class
+           looks up IPython in sys.modules, so a worker doing it while the main thread imports vectorbt
+           (which imports IPython) could read a partially initialized module and fail every chart."""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        FigureCanvasAgg(Figure())
+
+    def draw(self, frame: pd.DataFrame, title: str, file_name: str):
+        """Draw every line column of the frame, with markers where the 'position' column opens or closes a trade,
+           and return the path to the saved chart."""
+        # matplotlib is only loaded once a chart is really drawn
+        from matplotlib.figure import Figure
+
+        line_columns = [column for column in frame.columns if column not in ("signal", "position", "symbol")]
+        x = np.arange(len(frame))
+        kept = downsample_lttb(x, frame[line_columns[0]].to_numpy(), self.max_points)
+
+        figure = Figure(figsize=(12, 8))
+        axes = figure.subplots()
+        for column in line_columns:
+            axes.plot(frame.index[kept], frame[column].to_numpy()[kept], label=column)
+        # Trade markers are few, so they are drawn without downsampling
+        if "position" in frame.columns:
+            for position, (marker, color, label) in self.MARKERS.items():
+                rows = frame[frame["position"] == position]
+                axes.plot(rows.index, rows[line_columns[0]], marker, markersize=3, color=color, label=label)
+
+        axes.set_title(title)
+        axes.set_ylabel("Price")
+        axes.legend(loc="upper right")
+        os.makedirs(self.result_dir, exist_ok=True)
+        path_to_chart = os.path.join(self.result_dir, file_name)
+        figure.savefig(path_to_chart)
+
+        return path_to_chart
+
+    def submit(self, frame: pd.DataFrame, title: str, file_name: str):
+        """Draw the chart now or queue it for the background worker."""
+        if not self.enabled:
+            return None
+        if self._executor is None:
+            try:
+                return self.draw(frame, title, file_name)
+            except Exception as e:
+                logging.error(f"Error drawing the chart {file_name}: {e}")
+                return None
+
+        self._futures.append(self._executor.submit(self.draw, frame, title, file_name))
+        return None
+
+    def submit_backtest(self, strategy):
+        """Queue a chart of the strategy backtest for every trading pair."""
+        if not self.enabled:
+            return
+        backtest = strategy.run_backtest()
+        params = "_".join(f"{value}" for value in strategy.get_params().values())
+        name = type(strategy).__name__
+
+        if "symbol" in strategy.price_data.columns:
+            groups = backtest.groupby(strategy.price_data["symbol"], sort=False)
+        else:
+            groups = [("", backtest)]
+        for symbol, frame in groups:
+            file_name = "_".join(part for part in (name, params, symbol) if part) + ".png"
+            self.submit(frame, f"{symbol} {strategy}".strip(), file_name)
+
+    def close(self):
+        """Wait for the queued charts and return the paths to the drawn ones. A chart that fails is logged
+           and skipped, so plotting never fails the backtest it belongs to."""
+        paths = []
+        for future in self._futures:
+            try:
+                paths.append(future.result())
+            except Exception as e:
+                logging.error(f"Error drawing a chart: {e}")
+        self._futures = []
+        if self._executor is not None:
+            self._executor.shutdown()
+
+        return paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+# Binance intervals that can be derived from 1m bars. Every one of them divides a day,
+# so resampling a month partition on its own never splits a bar between two partitions
+INTERVAL_FREQS = {
+    "1m": "1min",
+    "3m": "3min",
+    "5m": "5min",
+    "15m": "15min",
+    "30m": "30min",
+    "1h": "1h",
+    "2h": "2h",
+    "4h": "4h",
+    "6h": "6h",
+    "8h": "8h",
+    "12h": "12h",
+    "1d": "1D"
+}
+OHLCV_AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+    "close_time": "last",
+    "quote_asset_volume": "sum",
+    "number_of_trades": "sum",
+    "taker_buy_base_asset_volume": "sum",
+    "taker_buy_quote_asset_volume": "sum"
+}
+
+
+def get_interval_delta(interval):
+    if interval not in INTERVAL_FREQS:
+        raise ValueError(f"Unsupported interval '{interval}'. Use one of {list(INTERVAL_FREQS)}.")
+
+    return pd.Timedelta(INTERVAL_FREQS[interval])
+
+
+def resample_ohlcv(data_frame, interval):
+    """Aggregate the bars of a (symbol-tagged) frame into bars of the given interval. Every bar is labelled
+       with its open time like Binance klines, and intervals without any source bar are skipped."""
+    delta = get_interval_delta(interval)
+    aggregations = {column: how for column, how in OHLCV_AGGREGATIONS.items() if column in data_frame.columns}
+    keys = ["symbol", "timestamp"] if "symbol" in data_frame.columns else ["timestamp"]
+    if data_frame.empty:
+        return data_frame[[column for column in data_frame.columns if column in keys or column in aggregations]]
+
+    # first/last need the bars of every group in time order
+    data_frame = data_frame.sort_values(keys, kind="stable")
+    groups = [data_frame[key] if key != "timestamp" else data_frame["timestamp"].dt.floor(delta) for key in keys]
+    resampled = data_frame.groupby(groups, sort=True).agg(aggregations).reset_index()
+
+    return resampled[[column for column in data_frame.columns if column in resampled.columns]]
+
+
+def align_timeframes(data_frame, higher_frame, interval, columns=("close",), base_interval="1m"):
+    """Return the given columns of a higher timeframe frame aligned with every bar of data_frame and named
+       '<column>_<interval>'. A higher timeframe bar becomes visible on the last base bar it covers, that is
+       when it closes, so no bar ever sees a value from its future."""
+    higher_frame = higher_frame[["timestamp"] + list(columns) +
+                                (["symbol"] if "symbol" in data_frame.columns else [])].copy()
+    higher_frame["timestamp"] = (higher_frame["timestamp"] + get_interval_delta(interval) -
+                                 get_interval_delta(base_interval))
+    higher_frame = higher_frame.rename(columns={column: f"{column}_{interval}" for column in columns})
+
+    # merge_asof needs both sides sorted by time, the original row order is restored afterwards
+    base = data_frame[["timestamp"] + (["symbol"] if "symbol" in data_frame.columns else [])].copy()
+    base["row"] = np.arange(len(base))
+    aligned = pd.merge_asof(base.sort_values("timestamp", kind="stable"), higher_frame.sort_values("timestamp"),
+                            on="timestamp", by="symbol" if "symbol" in base.columns else None,
+                            direction="backward")
+    aligned = aligned.sort_values("row")
+
+    return aligned[[f"{column}_{interval}" for column in columns]].set_axis(data_frame.index)
+
+
+class Resampler:
+    """Resampler class derives higher timeframes from the 1m bars of a ParquetStore and writes them back
+       as partitions of their own interval, so every month of every pair is resampled once instead of being
+       downloaded again. A derived partition records the checksum of its 1m source and is rebuilt
+       when the source is rewritten."""
+    BASE_INTERVAL = "1m"
+
+    def __init__(self, store):
+        self.store = store
+
+    def update(self, symbols=None, interval="5m", year_months=None):
+        """Derive the missing or stale partitions of the interval and return their keys."""
+        get_interval_delta(interval)
+        manifest = self.store.load_manifest()
+        written_keys = []
+
+        for source in manifest.values():
+            if (source["interval"] != self.BASE_INTERVAL or (symbols is not None and source["symbol"] not in symbols)
+                    or (year_months is not None and source["year_month"] not in year_months)):
+                continue
+            key = self.store.get_key(source["symbol"], interval, source["year_month"])
+            if manifest.get(key, {}).get("source") == source["checksum"]:
+                continue
+
+            bars = self.store.read([source["symbol"]], self.BASE_INTERVAL, [source["year_month"]])
+            self.store.write_partition(resample_ohlcv(bars, interval), source["symbol"], interval,
+                                       source["year_month"], overwrite=True, source=source["checksum"])
+            written_keys.append(key)
+
+        return written_keys
+
+    def read(self, symbols=None, interval="1m", year_months=None, columns=None):
+        """Read bars of any supported interval, resampling the 1m store first when needed."""
+        if interval != self.BASE_INTERVAL:
+            self.update(symbols, interval, year_months)
+
+        return self.store.read(symbols, interval, year_months, columns)
+
+    def read_timeframes(self, symbols=None, intervals=("1m", "1h"), year_months=None, columns=("close",)):
+        """Read the bars of the first interval and attach the given columns of every other interval,
+           aligned on the same rows as '<column>_<interval>'."""
+        base_interval, *higher_intervals = intervals
+        data_frame = self.read(symbols, base_interval, year_months)
+        for interval in higher_intervals:
+            higher_frame = self.read(symbols, interval, year_months, columns)
+            data_frame = data_frame.join(align_timeframes(data_frame, higher_frame, interval, columns,
+                                                          base_interval))
+
+        return data_frame
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import pandas as pd
+
+
+class ResultsStore:
+    """ResultsStore class keeps the results of backtest runs in an SQLite database. A run is keyed by a hash
+       of the strategy, its parameters, the dataset fingerprint, the engine with its version and the run
+       settings, so repeating a run returns the stored result instead of recomputing it. Every run keeps its
+       per-symbol metrics, the strategy summary and the time it took, and the runs can be queried and
+       compared side by side."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            key TEXT PRIMARY KEY,
+            strategy TEXT,
+            params TEXT,
+            dataset TEXT,
+            engine TEXT,
+            settings TEXT,
+            summary TEXT,
+            metric_names TEXT,
+            seconds REAL,
+            created_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS metrics (
+            key TEXT,
+            symbol TEXT,
+            metric TEXT,
+            value REAL,
+            PRIMARY KEY (key, symbol, metric)
+        );
+        CREATE INDEX IF NOT EXISTS runs_strategy ON runs (strategy, dataset);
+    """
+
+    def __init__(self, path="results/results.sqlite"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(self.SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def get_key(strategy, params, dataset, engine, settings=None):
+        """Hash the description of a run into its key."""
+        description = [strategy, params, dataset, engine, settings or {}]
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+    @staticmethod
+    def get_dataset_fingerprint(data):
+        """Return a hash of the content of a frame or series, its index included."""
+        digest = hashlib.sha256(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        names = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(json.dumps([list(map(str, names)), data.shape]).encode())
+
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the (summary, per-symbol metrics) of a stored run, or None if the run isn't stored."""
+        results = self.get_many([key])
+        return results.get(key)
+
+    def get_many(self, keys):
+        """Return a dict mapping the stored ones of the keys to their (summary, per-symbol metrics)."""
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        results = {}
+        with self._connect() as connection:
+            # Query in batches under the SQLite limit of bound parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                runs = pd.read_sql_query(f"SELECT key, summary, metric_names FROM runs WHERE key IN ({placeholders})",
+                                         connection, params=batch)
+                metrics = pd.read_sql_query(f"SELECT * FROM metrics WHERE key IN ({placeholders})", connection,
+                                            params=batch)
+                for run in runs.itertuples():
+                    results[run.key] = (json.loads(run.summary) if run.summary else None,
+                                        self._to_wide(metrics[metrics["key"] == run.key], json.loads(run.metric_names)))
+
+        return results
+
+    @staticmethod
+    def _to_wide(metrics, metric_names):
+        symbol_metrics = metrics.pivot(index="symbol", columns="metric", values="value").reindex(columns=metric_names)
+        symbol_metrics.columns.name = None
+        if "total_trades" in symbol_metrics.columns:
+            symbol_metrics["total_trades"] = symbol_metrics["total_trades"].astype("int64")
+
+        return symbol_metrics
+
+    def put(self, key, strategy, params, dataset, engine, symbol_metrics, settings=None, summary=None, seconds=None):
+        """Store a run with its per-symbol metrics frame (a row per symbol, a column per metric)."""
+        self.put_many([(key, strategy, params, dataset, engine, symbol_metrics, settings, summary, seconds)])
+
+    def put_many(self, runs):
+        """Store many runs, given as tuples of the put() arguments, in one transaction."""
+        created_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as connection:
+            for key, strategy, params, dataset, engine, symbol_metrics, settings, summary, seconds in runs:
+                connection.execute("DELETE FROM metrics WHERE key = ?", (key,))
+                connection.execute(
+                    "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, strategy, json.dumps(params, sort_keys=True, default=str), dataset, engine,
+                     json.dumps(settings or {}, sort_keys=True), json.dumps(summary) if summary is not None else None,
+                     json.dumps(list(symbol_metrics.columns)), seconds, created_at))
+                long_metrics = symbol_metrics.stack(future_stack=True)
+                connection.executemany(
+                    "INSERT INTO metrics VALUES (?, ?, ?, ?)",
+                    [(key, str(symbol), metric, None if pd.isna(value) else float(value))
+                     for (symbol, metric), value in long_metrics.items()])
+
+    def query(self, strategy=None, dataset=None, engine=None):
+        """Return a frame with a row per (run, symbol): the run description and its metrics.
+           The runs may be filtered by strategy, dataset fingerprint and engine."""
+        conditions, params = [], []
+        for column, value in (("strategy", strategy), ("dataset", dataset), ("engine", engine)):
+            if value is not None:
+                conditions.append(f"runs.{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connect() as connection:
+            long_metrics = pd.read_sql_query(
+                f"SELECT runs.key, runs.strategy, runs.params, runs.dataset, runs.engine, runs.settings, "
+                f"runs.seconds, runs.created_at, metrics.symbol, metrics.metric, metrics.value "
+                f"FROM runs JOIN metrics ON runs.key = metrics.key {where}", connection, params=params)
+        if long_metrics.empty:
+            return long_metrics
+
+        run_columns = ["key", "strategy", "params", "dataset", "engine", "settings", "seconds", "created_at", "symbol"]
+        runs = long_metrics.set_index(run_columns + ["metric"])["value"].unstack("metric").reset_index()
+        runs.columns.name = None
+
+        return runs.sort_values(["created_at", "key", "symbol"], ignore_index=True)
+
+    def compare(self, metric="total_return", **filters):
+        """Return one metric of the matching runs side by side: a row per run, a column per symbol."""
+        runs = self.query(**filters)
+        if runs.empty:
+            return runs
+
+        return runs.pivot_table(index=["strategy", "params", "engine", "key"], columns="symbol", values=metric)
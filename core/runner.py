@@ -0,0 +1,119 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from core.backtester import Backtester, run_portfolio
+from core.cache import MatrixCache
+
+# A job runs one strategy class with the given parameters over a set of symbols
+BacktestJob = namedtuple("BacktestJob", ["strategy_class", "params", "symbols"])
+
+# The close matrix attached by every worker process, the shared memory block it lives in
+# and the engine and costs the jobs are simulated with
+_worker_close = None
+_worker_block = None
+_worker_settings = None
+
+
+def get_job_table(job_metrics, job_number, strategy_name, params, job_time):
+    """Turn the per-symbol metrics of a job into rows of the job table, tagged with the job and its wall time."""
+    job_metrics.index.name = "symbol"
+    job_metrics = job_metrics.reset_index()
+    job_metrics.insert(0, "job", job_number)
+    job_metrics.insert(1, "strategy", strategy_name)
+    job_metrics.insert(2, "params", str(params))
+    job_metrics["job_time"] = job_time
+
+    return job_metrics
+
+
+def _attach_close(settings, shared_memory_name, shape, dtype, index, columns):
+    # Open the close matrix from shared memory once per worker, without copying it. The block is kept
+    # in a global, as frames derived from the matrix would copy their attrs and map the block again
+    global _worker_close, _worker_block, _worker_settings
+    _worker_block = shared_memory.SharedMemory(name=shared_memory_name)
+    values = np.ndarray(shape, dtype=dtype, buffer=_worker_block.buf)
+    _worker_close = pd.DataFrame(values, index=index, columns=columns, copy=False)
+    _worker_settings = settings
+
+
+def _open_cached_close(settings, root_dir, key):
+    # Open the close matrix memory-mapped from the matrix cache once per worker
+    global _worker_close, _worker_settings
+    _worker_close = MatrixCache(root_dir).get(key)["close"]
+    _worker_settings = settings
+
+
+def _run_job(job_number, job):
+    start_time = time.perf_counter()
+
+    # Generate signals for every symbol and run them as columns of one portfolio,
+    # carrying the last known price over missing bars like Backtester does
+    close = _worker_close[list(job.symbols)].ffill()
+    signals = {}
+    for symbol in close.columns:
+        strategy = job.strategy_class(pd.DataFrame({"close": close[symbol]}, copy=False), **job.params)
+        signals[symbol] = strategy.get_signals()["signal"].astype(bool)
+    signal = pd.DataFrame(signals, index=close.index)
+
+    job_metrics = run_portfolio(close, signal, **_worker_settings)
+
+    return get_job_table(job_metrics, job_number, job.strategy_class.__name__, job.params,
+                         time.perf_counter() - start_time)
+
+
+class ParallelRunner:
+    """ParallelRunner class spreads backtest jobs over a process pool. The (timestamp x symbol) close matrix
+       is placed in shared memory once, so workers read it in place instead of receiving pickled frames.
+       A matrix already held by a core.cache.MatrixCache is opened memory-mapped by every worker instead.
+       Every job is simulated by core.backtester.run_portfolio with the given engine and trading costs, so it gives
+       the same metrics as a Backtester run. The metrics of all jobs are collected into one table with the wall
+       time of every job."""
+    def __init__(self, close: pd.DataFrame = None, max_workers=None, matrix_cache: MatrixCache = None,
+                 cache_key=None, engine="vectorbt", fees=0.0, slippage=0.0, stop_loss=0.0, take_profit=0.0,
+                 size=1.0, freq="1min"):
+        if engine not in Backtester.ENGINES:
+            raise ValueError(f"Unknown engine {engine}, expected one of {Backtester.ENGINES}.")
+        self.close = close
+        self.max_workers = max_workers or os.cpu_count()
+        self.matrix_cache = matrix_cache
+        self.cache_key = cache_key
+        self.settings = {"engine_name": engine, "fees": fees, "slippage": slippage, "stop_loss": stop_loss,
+                         "take_profit": take_profit, "size": size, "freq": freq}
+
+    def run(self, jobs):
+        if self.matrix_cache is not None:
+            return self.run_jobs(jobs, _open_cached_close, (self.settings, self.matrix_cache.root_dir,
+                                                             self.cache_key))
+
+        values = np.ascontiguousarray(self.close.to_numpy(dtype=np.float64))
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+
+        try:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            return self.run_jobs(jobs, _attach_close, (self.settings, block.name, values.shape, values.dtype,
+                                                       self.close.index, self.close.columns))
+        finally:
+            block.close()
+            block.unlink()
+
+    def run_jobs(self, jobs, initializer, initargs):
+        """Run the jobs in workers that attach the close matrix with the given initializer."""
+        results = []
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=initializer,
+                                 initargs=initargs) as executor:
+            futures = {executor.submit(_run_job, job_number, job): job_number
+                       for job_number, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"Error while running job {futures[future]}: {e}")
+
+        if not results:
+            return pd.DataFrame()
+
+        return pd.concat(results, ignore_index=True).sort_values(["job", "symbol"], ignore_index=True)
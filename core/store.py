@@ -0,0 +1,132 @@
+import os
+import json
+import hashlib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from core.instrumentation import stage_tracker
+
+
+class ParquetStore:
+    """ParquetStore class keeps OHLCV data as a Hive-partitioned Parquet dataset laid out as
+       symbol=<symbol>/interval=<interval>/year_month=<year_month>/data.parquet.
+       New months are appended as new partitions and a manifest records what the store holds,
+       so reads only open the needed partitions and columns."""
+    MANIFEST_FILE = "_manifest.json"
+    PARTITION_KEYS = ["symbol", "interval", "year_month"]
+    PARTITIONING = ds.partitioning(pa.schema([(key, pa.string()) for key in PARTITION_KEYS]), flavor="hive")
+
+    def __init__(self, root_dir="data/store"):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    @staticmethod
+    def get_key(symbol, interval, year_month):
+        return f"{symbol}/{interval}/{year_month}"
+
+    def get_partition_path(self, symbol, interval, year_month):
+        return os.path.join(self.root_dir, f"symbol={symbol}", f"interval={interval}",
+                            f"year_month={year_month}", "data.parquet")
+
+    def load_manifest(self):
+        path_to_manifest = os.path.join(self.root_dir, self.MANIFEST_FILE)
+        if not os.path.exists(path_to_manifest):
+            return {}
+
+        with open(path_to_manifest) as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest):
+        # Replace the manifest atomically so a crash never leaves it half written
+        path_to_manifest = os.path.join(self.root_dir, self.MANIFEST_FILE)
+        with open(f"{path_to_manifest}.tmp", "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(f"{path_to_manifest}.tmp", path_to_manifest)
+
+    def get_manifest(self):
+        """Return a frame with a row per stored partition."""
+        columns = self.PARTITION_KEYS + ["rows", "start", "end", "checksum", "path"]
+        return pd.DataFrame(list(self.load_manifest().values()), columns=columns)
+
+    def has_partition(self, symbol, interval, year_month):
+        return self.get_key(symbol, interval, year_month) in self.load_manifest()
+
+    def write_partition(self, data_frame, symbol, interval, year_month, overwrite=False, source=None):
+        """Write one month of one pair as a partition. An existing partition is kept unless overwrite is set.
+           A partition derived from another one records the checksum of its source."""
+        key = self.get_key(symbol, interval, year_month)
+        manifest = self.load_manifest()
+        if key in manifest and not overwrite:
+            return False
+
+        # The partition keys live in the directory names, not in the file
+        table = pa.Table.from_pandas(data_frame.drop(columns=self.PARTITION_KEYS, errors="ignore"),
+                                     preserve_index=False)
+        path_to_parquet = self.get_partition_path(symbol, interval, year_month)
+        os.makedirs(os.path.dirname(path_to_parquet), exist_ok=True)
+        pq.write_table(table, f"{path_to_parquet}.tmp", compression="snappy")
+        os.replace(f"{path_to_parquet}.tmp", path_to_parquet)
+        with open(path_to_parquet, "rb") as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+
+        manifest[key] = {
+            "symbol": symbol,
+            "interval": interval,
+            "year_month": year_month,
+            "rows": table.num_rows,
+            "start": str(data_frame["timestamp"].min()) if table.num_rows else None,
+            "end": str(data_frame["timestamp"].max()) if table.num_rows else None,
+            "checksum": checksum,
+            "path": os.path.relpath(path_to_parquet, self.root_dir)
+        }
+        if source is not None:
+            manifest[key]["source"] = source
+        self._save_manifest(manifest)
+
+        return True
+
+    def _select_entries(self, symbols=None, intervals=None, year_months=None):
+        return [
+            entry for _, entry in sorted(self.load_manifest().items())
+            if (symbols is None or entry["symbol"] in symbols) and
+               (intervals is None or entry["interval"] in intervals) and
+               (year_months is None or entry["year_month"] in year_months)
+        ]
+
+    def get_fingerprint(self, symbols=None, interval=None, year_months=None):
+        """Return a hash of the content of the matching partitions. It changes whenever one of them is rewritten."""
+        entries = self._select_entries(symbols, [interval] if interval is not None else None, year_months)
+        digest = hashlib.sha256()
+        for entry in entries:
+            digest.update(f"{entry['symbol']}/{entry['interval']}/{entry['year_month']}:{entry['checksum']};".encode())
+
+        return digest.hexdigest()
+
+    def get_dataset(self, symbols=None, intervals=None, year_months=None):
+        """Return a pyarrow dataset over the partitions that match the given keys, chosen from the manifest
+           so that the directory tree is never listed."""
+        paths = [os.path.join(self.root_dir, entry["path"])
+                 for entry in self._select_entries(symbols, intervals, year_months)]
+
+        return ds.dataset(paths, format="parquet", partitioning=self.PARTITIONING,
+                          partition_base_dir=self.root_dir)
+
+    def read(self, symbols=None, interval=None, year_months=None, columns=None, filter=None):
+        """Read a symbol-tagged long frame. Only the requested partitions and columns are loaded,
+           and an optional pyarrow filter expression is pushed down into the Parquet scan."""
+        dataset = self.get_dataset(symbols, [interval] if interval is not None else None, year_months)
+        if columns is not None:
+            columns = list(dict.fromkeys(["timestamp"] + list(columns) + ["symbol"]))
+        if not dataset.files:
+            # Without any matching partition the dataset has no schema to select the columns from
+            return pd.DataFrame(columns=columns)
+
+        with stage_tracker.stage("store.read", interval=interval) as event:
+            table = dataset.to_table(columns=columns, filter=filter)
+            event["rows"], event["bytes"] = table.num_rows, table.nbytes
+            data_frame = table.to_pandas()
+        if data_frame.empty:
+            return data_frame
+
+        return data_frame.sort_values(["symbol", "timestamp"], ignore_index=True)
@@ -0,0 +1,93 @@
+import time
+import numpy as np
+import pandas as pd
+from core import engine
+from core.backtester import Backtester
+from core.metrics import compute_simulation_metrics
+from core.reporting import save_csv
+from strategies.sma_cross import SmaCrossover
+
+
+class ParameterSweep:
+    """ParameterSweep class evaluates a whole parameter grid of a strategy in one batched portfolio
+       and ranks the combinations by a chosen metric. With a core.results.ResultsStore only the
+       combinations that aren't stored yet are simulated, so rerunning a grid that grew or changed a little
+       costs only the new combinations. The Sharpe ratio is annualized for the bar frequency freq."""
+    RESULT_DIR = "results"
+
+    def __init__(self, close: pd.Series, strategy_class=SmaCrossover, results_store=None, freq="1min"):
+        self.close = close
+        self.strategy_class = strategy_class
+        self.results_store = results_store
+        self.freq = freq
+
+    def get_signals(self, **grid) -> pd.DataFrame:
+        return self.strategy_class.sweep_signals(self.close, **grid)
+
+    def simulate(self, signals: pd.DataFrame, engine_name="vectorbt") -> pd.DataFrame:
+        """Run all combinations as columns of one portfolio and return the metrics with a row per combination."""
+        if engine_name == "numba":
+            # Every combination reads the same close column through a broadcast view, without copies
+            close = np.broadcast_to(self.close.to_numpy(dtype=np.float64)[:, None], signals.shape)
+            result = engine.simulate(close, signals.to_numpy())
+            sweep_metrics = compute_simulation_metrics(result, freq=self.freq)
+            sweep_metrics.index = signals.columns
+            return sweep_metrics
+
+        import vectorbt as vbt
+
+        portfolio = vbt.Portfolio.from_signals(
+            self.close,
+            signals,
+            ~signals,
+            freq=self.freq
+        )
+        return Backtester.get_portfolio_metrics(portfolio, self.freq)
+
+    def run(self, sort_by="total_return", ascending=False, engine_name="vectorbt", **grid) -> pd.DataFrame:
+        # Build the (time x combination) signal matrix in one pass
+        signals = self.get_signals(**grid)
+
+        if self.results_store is None:
+            sweep_metrics = self.simulate(signals, engine_name)
+        else:
+            sweep_metrics = self.simulate_missing(signals, engine_name)
+
+        # Rank the combinations, the best one first
+        ranked = sweep_metrics.sort_values(sort_by, ascending=ascending)
+        ranked.insert(0, "rank", range(1, len(ranked) + 1))
+
+        return ranked
+
+    def simulate_missing(self, signals: pd.DataFrame, engine_name="vectorbt") -> pd.DataFrame:
+        """Take the stored metrics of the combinations from the results store, simulate only the missing ones
+           and store them."""
+        engine_version = Backtester.get_engine_version(engine_name)
+        dataset = self.results_store.get_dataset_fingerprint(self.close)
+        params = [dict(zip(signals.columns.names, combination)) for combination in signals.columns]
+        settings = {"freq": self.freq}
+        run_keys = [self.results_store.get_key(self.strategy_class.NAME, combination_params, dataset, engine_version,
+                                               settings) for combination_params in params]
+        rows = {key: symbol_metrics.iloc[0] for key, (_, symbol_metrics) in
+                self.results_store.get_many(run_keys).items()}
+
+        missing = np.array([key not in rows for key in run_keys])
+        if missing.any():
+            start_time = time.perf_counter()
+            new_metrics = self.simulate(signals.loc[:, missing], engine_name)
+            seconds = (time.perf_counter() - start_time) / missing.sum()
+            new_runs = []
+            for position, (_, row) in zip(np.flatnonzero(missing), new_metrics.iterrows()):
+                rows[run_keys[position]] = row
+                new_runs.append((run_keys[position], self.strategy_class.NAME, params[position], dataset,
+                                 engine_version, row.to_frame(self.close.name).T, settings, None, seconds))
+            self.results_store.put_many(new_runs)
+
+        sweep_metrics = pd.DataFrame([rows[key] for key in run_keys], index=signals.columns)
+        if "total_trades" in sweep_metrics.columns:
+            sweep_metrics["total_trades"] = sweep_metrics["total_trades"].astype("int64")
+
+        return sweep_metrics
+
+    def save(self, ranked: pd.DataFrame, file_name="sweep_metrics.csv"):
+        return save_csv(ranked, self.RESULT_DIR, file_name)
@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from core import engine
+from core.metrics import compute_simulation_metrics
+from strategies.sma_cross import SmaCrossover
+
+
+class WalkForward:
+    """WalkForward class validates a strategy out of sample. The history is split into rolling folds of
+       train_size bars followed by test_size bars; the parameters are optimized on every train window and
+       evaluated on the next test window, and the test windows are stitched into one out-of-sample equity curve.
+       The signal matrix of the whole grid is computed once over the full history, so overlapping windows share
+       their indicators, and the folds run in parallel threads over that one matrix. The Sharpe ratio is annualized
+       for the bar frequency freq."""
+    def __init__(self, close: pd.Series, train_size: int, test_size: int, strategy_class=SmaCrossover,
+                 max_workers=None, sort_by="total_return", freq="1min"):
+        self.close = close
+        self.train_size = train_size
+        self.test_size = test_size
+        self.strategy_class = strategy_class
+        self.max_workers = max_workers
+        self.sort_by = sort_by
+        self.freq = freq
+
+    def get_folds(self):
+        """Return the list of (train_start, train_end, test_end) row positions of every fold."""
+        return [(test_start - self.train_size, test_start, min(test_start + self.test_size, len(self.close)))
+                for test_start in range(self.train_size, len(self.close), self.test_size)]
+
+    def _run_fold(self, close_values, signals, fold):
+        train_start, test_start, test_end = fold
+
+        # Optimize on the train window: every combination is a column of one simulation
+        train_signals = signals[train_start:test_start]
+        train_close = np.broadcast_to(close_values[train_start:test_start, None], train_signals.shape)
+        train_metrics = compute_simulation_metrics(engine.simulate(train_close, train_signals), freq=self.freq)
+        scores = train_metrics[self.sort_by].to_numpy()
+        # When no combination trades in the window every score may be NaN (a flat equity has no Sharpe ratio),
+        # then the first combination is kept
+        best = 0 if np.isnan(scores).all() else int(np.nanargmax(scores))
+
+        # Evaluate the best combination on the following test window
+        test_result = engine.simulate(close_values[test_start:test_end], signals[test_start:test_end, best])
+        test_metrics = compute_simulation_metrics(test_result, freq=self.freq)
+
+        return best, train_metrics.loc[best, self.sort_by], test_metrics.iloc[0], test_result.equity.iloc[:, 0]
+
+    def run(self, **grid):
+        """Return the table of folds with the chosen parameters and their metrics, and the stitched
+           out-of-sample equity curve starting from 1."""
+        folds = self.get_folds()
+        if not folds:
+            raise ValueError("The history is shorter than one train window and one test bar.")
+
+        # Compute the signals of all combinations once for the whole history
+        signals = self.strategy_class.sweep_signals(self.close, **grid)
+        combinations = signals.columns
+        signal_values = signals.to_numpy()
+        close_values = self.close.to_numpy(dtype=np.float64)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda fold: self._run_fold(close_values, signal_values, fold), folds))
+
+        rows = []
+        equity_parts = []
+        capital = 1.0
+        for number, ((train_start, test_start, test_end), (best, train_score, test_metrics, equity)) in \
+                enumerate(zip(folds, results)):
+            rows.append({
+                "fold": number,
+                "train_start": self.close.index[train_start],
+                "test_start": self.close.index[test_start],
+                "test_end": self.close.index[test_end - 1],
+                **dict(zip(combinations.names, combinations[best])),
+                f"train_{self.sort_by}": train_score,
+                **{f"test_{name}": value for name, value in test_metrics.items()}
+            })
+            # Chain the test windows, every one starting with the capital the previous one ended with
+            fold_equity = equity.to_numpy() / 100.0 * capital
+            equity_parts.append(pd.Series(fold_equity, index=self.close.index[test_start:test_end]))
+            capital = fold_equity[-1]
+
+        return pd.DataFrame(rows), pd.concat(equity_parts).rename("equity")
@@ -1,48 +1,199 @@
-import core.backtester as bt
-import core.data_loader as dl
-import strategies.sma_cross as sma
+import os
+import sys
+import glob
+import argparse
+import core.instrumentation as ins
 
+# The heavy libraries (pandas, pyarrow, numba, vectorbt, matplotlib) are imported inside the commands,
+# so every command only pays for what it uses
+BASE_OHLCV_URL = "https://data.binance.vision/data/spot/monthly/klines/"
+EXCHANGE_INFO_URL = "https://api.binance.com/api/v3/exchangeInfo"
+TICKER_24H_URL = "https://api.binance.com/api/v3/ticker/24hr"
 
-def main():
-    try:
-        # Get the list of 100 the most liquid trading pairs for the last 24 hours
-        top_liqui_obg = dl.TopLiquidLoader("https://api.binance.com/api/v3/exchangeInfo", "BTC")
-        pairs = top_liqui_obg.get_top_liquid("https://api.binance.com/api/v3/ticker/24hr")
 
-        if not pairs:
-            raise ValueError("No trading pairs found!")
+def fetch(year_months=("2025-02",), quote_asset="BTC", top=100, offline=False):
+    """Download the 1m archives of the most liquid pairs for the months missing from the store.
+       Higher intervals are derived from the 1m bars, so they are never downloaded.
+       Return the pairs and the dict of downloaded archives."""
+    import core.data_loader as dl
+    import core.resample as rsp
+    import core.store as st
+
+    # Get the list of the most liquid trading pairs for the last 24 hours
+    # (the exchange responses are cached on disk for 12 hours)
+    top_liqui_obg = dl.TopLiquidLoader(EXCHANGE_INFO_URL, quote_asset, cache_dir="data/json_cache",
+                                       ttl=12 * 3600, offline=offline)
+    pairs = top_liqui_obg.get_top_liquid(TICKER_24H_URL, top_liquid_number=top)
+
+    if not pairs:
+        raise ValueError("No trading pairs found!")
+
+    # Download zips with OHLCV information for the months missing from the store concurrently
+    store_obj = st.ParquetStore()
+    base_interval = rsp.Resampler.BASE_INTERVAL
+    symbols = [pair['pair'] for pair in pairs]
+    missing_symbols = [symbol for symbol in symbols
+                       if not all(store_obj.has_partition(symbol, base_interval, year_month)
+                                  for year_month in year_months)]
+    csv_loader_obj = dl.CsvLoader(BASE_OHLCV_URL)
+    paths_to_zips = csv_loader_obj.bulk_download(missing_symbols, [base_interval], list(year_months))
+
+    return symbols, paths_to_zips
+
+
+def load(paths_to_zips):
+    """Append the months of the archives straight to the partitioned store and return the written keys."""
+    import core.data_loader as dl
+    import core.store as st
+
+    data_loader_obj = dl.DataLoader(list(paths_to_zips))
+    return data_loader_obj.update_store(st.ParquetStore())
+
+
+def backtest(symbols=None, interval="1m", year_months=("2025-02",), strategy_name="sma_cross", params=None,
+             engine_name="vectorbt", fees=0.0, slippage=0.0, charts=True):
+    """Backtest a registered strategy over the stored data and return its metrics and per-symbol results."""
+    import core.backtester as bt
+    import core.cache as ch
+    import core.reporting as rp
+    import core.resample as rsp
+    import core.results as rs
+    import core.store as st
+    import strategies.registry as rg
+
+    # Read only the needed pairs and columns back from the store, higher intervals are derived from the 1m bars
+    store_obj = st.ParquetStore()
+    strategy_class = rg.get_strategy(strategy_name)
+    merged_data = rsp.Resampler(store_obj).read(symbols=symbols, interval=interval, year_months=list(year_months),
+                                                columns=["open", "high", "low", "close", "volume"])
+
+    if merged_data is None or merged_data.empty:
+        raise ValueError("The Data Frame is empty or wasn't created!")
+
+    # The aligned close matrix is opened memory-mapped from the matrix cache instead of being pivoted every run
+    matrices = ch.MatrixCache().get_matrices(store_obj, symbols, interval, list(year_months), columns=("close",))
+    strategy_obj = strategy_class(merged_data, **(params or {}))
+
+    # Get results of backtest, the charts are drawn in the background
+    with rp.ChartReporter(background=True, enabled=charts) as reporter_obj:
+        # Repeated runs over the same stored data are answered from the results database
+        backtester_obj = bt.Backtester(merged_data, strategy_obj, engine=engine_name, fees=fees, slippage=slippage,
+                                       reporter=reporter_obj, results_store=rs.ResultsStore(),
+                                       dataset=store_obj.get_fingerprint(symbols, interval, list(year_months)),
+                                       close_matrix=matrices["close"], freq=rsp.INTERVAL_FREQS[interval])
+        return backtester_obj.get_backtest_results()
+
 
-        # Download and unpack zips with OHLCV information for a certain period,
-        # extract all csv files anf create a list with paths to them
-        pairs_csv_paths = []
-        csv_loader_obj = dl.CsvLoader("https://data.binance.vision/data/spot/monthly/klines/")
+def report(strategy_name=None, metric="total_return", top=20):
+    """Rank the stored runs by a metric averaged over their symbols, save the table to results/report.csv
+       and return it."""
+    import core.reporting as rp
+    import core.results as rs
 
-        for pair in pairs:
-            try:
-                path = csv_loader_obj.extract_ohlcv_zip(pair['pair'], "1m", "2025-02")
-                pairs_csv_paths.append(path)
-            except Exception as e:
-                print(f"The {pair['pair']} wasn't downloaded: {e}")
+    runs = rs.ResultsStore().query(strategy=strategy_name)
+    if runs.empty:
+        raise ValueError("The results database has no runs yet.")
 
-        if not pairs_csv_paths:
-            raise ValueError("No CSV files were downloaded!")
+    # Every run is summarized by the mean of its metrics over the symbols
+    run_columns = ["key", "strategy", "params", "dataset", "engine", "settings", "seconds", "created_at"]
+    metric_columns = [column for column in runs.columns if column not in run_columns + ["symbol"]]
+    if metric not in metric_columns:
+        raise ValueError(f"Unknown metric {metric!r}, available: {', '.join(metric_columns)}")
+    ranked = (runs.groupby(run_columns, as_index=False, dropna=False)[metric_columns].mean()
+              .sort_values(metric, ascending=False, ignore_index=True))
+    rp.save_csv(ranked, "results", "report.csv", index=False)
+    print(ranked.head(top).to_string(index=False))
 
-        # Get the data frame and create a parquet file with all pairs information
-        data_loader_obj = dl.DataLoader(pairs_csv_paths)
-        merged_data = data_loader_obj.create_parquet('btc_1m_feb25')
+    return ranked
 
-        if merged_data is None or merged_data.empty:
-            raise ValueError("The Data Frame is empty or wasn't created!")
 
-        # Create a SNA Crossover strategy object
-        sma_obj = sma.SmaCrossover(merged_data)
+def parse_params(items):
+    # Turn ["short_window=30", "num_std=2.5"] into {"short_window": 30, "num_std": 2.5}
+    import ast
 
-        # Get results of backtest
-        backtester_obj = bt.Backtester(merged_data, sma_obj)
-        backtester_obj.get_backtest_results()
+    params = {}
+    for item in items or []:
+        name, value = item.split("=", 1)
+        try:
+            params[name] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            params[name] = value
+
+    return params
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Backtest trading strategies on Binance OHLCV data. "
+                                                 "Without a command the whole fetch, load and backtest pipeline runs.")
+    parser.add_argument("--profile", action="store_true", help="write a cProfile report to results/profile.txt")
+    parser.add_argument("--trace-memory", action="store_true", help="add tracemalloc peaks to the stage events")
+    subparsers = parser.add_subparsers(dest="command")
+
+    data_parser = argparse.ArgumentParser(add_help=False)
+    data_parser.add_argument("--months", nargs="+", default=["2025-02"])
+
+    fetch_parser = subparsers.add_parser("fetch", parents=[data_parser], help="download the archives of the top pairs")
+    fetch_parser.add_argument("--quote", default="BTC")
+    fetch_parser.add_argument("--top", type=int, default=100)
+    fetch_parser.add_argument("--offline", action="store_true", help="use only the cached exchange responses")
+
+    subparsers.add_parser("load", parents=[data_parser], help="append the downloaded archives to the store")
+
+    backtest_parser = subparsers.add_parser("backtest", parents=[data_parser], help="backtest a strategy")
+    backtest_parser.add_argument("--interval", default="1m", help="bar interval, derived from the 1m bars")
+    backtest_parser.add_argument("--strategy", default="sma_cross")
+    backtest_parser.add_argument("--params", nargs="+", metavar="NAME=VALUE")
+    backtest_parser.add_argument("--symbols", nargs="+")
+    backtest_parser.add_argument("--engine", default="vectorbt", choices=["vectorbt", "numba"])
+    backtest_parser.add_argument("--fees", type=float, default=0.0)
+    backtest_parser.add_argument("--slippage", type=float, default=0.0)
+    backtest_parser.add_argument("--no-charts", action="store_true")
+
+    report_parser = subparsers.add_parser("report", help="rank the stored backtest runs")
+    report_parser.add_argument("--strategy")
+    report_parser.add_argument("--metric", default="total_return")
+    report_parser.add_argument("--top", type=int, default=20)
+
+    subparsers.add_parser("warmup", help="compile the numba kernels into the on-disk cache")
+
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+
+    # Record the stages of the run as JSON lines in results/events.jsonl
+    ins.stage_tracker.enable(profile=args.profile, trace_memory=args.trace_memory)
+    try:
+        if args.command == "fetch":
+            _, paths_to_zips = fetch(args.months, args.quote, args.top, args.offline)
+            print(f"{len(paths_to_zips)} archives downloaded.")
+        elif args.command == "load":
+            paths_to_zips = [path for year_month in args.months
+                             for path in glob.glob(os.path.join("data", f"*-1m-{year_month}.zip"))]
+            print(f"{len(load(paths_to_zips))} partitions added to the store.")
+        elif args.command == "backtest":
+            backtest(args.symbols, args.interval, args.months, args.strategy, parse_params(args.params),
+                     args.engine, args.fees, args.slippage, charts=not args.no_charts)
+        elif args.command == "report":
+            report(args.strategy, args.metric, args.top)
+        elif args.command == "warmup":
+            import core.engine as en
+            en.warm_up()
+        else:
+            symbols, paths_to_zips = fetch()
+            load(paths_to_zips.values())
+            backtest(symbols)
     except Exception as e:
         print(f"Error: {e}")
+        return 1
+    finally:
+        # Summarize where the run spent its time next to the metrics
+        ins.stage_tracker.save_summary()
+        ins.stage_tracker.disable()
+
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
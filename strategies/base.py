@@ -1,19 +1,135 @@
+import itertools
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
+from core.instrumentation import stage_tracker
+from core.data_loader import DataLoader
+from core.metrics import compute_simulation_metrics
+from core.resample import align_timeframes, resample_ohlcv
+from strategies.indicators import IndicatorCache, shared_indicator_cache
 
 
 class StrategyBase(ABC):
-    def __init__(self, price_data: pd.DataFrame):
+    """StrategyBase class is the interface of all strategies."""
+    # Name in the strategy registry
+    NAME = None
+    # Price columns the strategy reads
+    REQUIRED_COLUMNS = ('close',)
+    # Values of every parameter explored by sweeps and batch runs
+    PARAM_SPACE = {}
+
+    def __init__(self, price_data: pd.DataFrame, indicator_cache: IndicatorCache = None):
+        # price_data is never written into, so several strategies can share one frame: signals are returned
+        # as separate frames aligned with it and indicators come from an IndicatorCache shared by all strategies
         self.price_data = price_data
+        self.indicator_cache = indicator_cache if indicator_cache is not None else shared_indicator_cache
+        self._signals = None
+        self._stream_states = {}
+        self._timeframes = {}
+
+    def get_indicator(self, indicator: str, window: int, column: str = 'close') -> pd.Series:
+        return self.indicator_cache.get(self.price_data, indicator, window, column)
+
+    def group(self, series: pd.Series):
+        # Group by trading pair so that per-pair operations never cross pair boundaries
+        if 'symbol' in self.price_data.columns:
+            return series.groupby(self.price_data['symbol'], sort=False)
+        return series.groupby(np.zeros(len(series), dtype=int), sort=False)
+
+    def get_timeframe(self, interval: str, column: str = 'close', base_interval: str = '1m') -> pd.Series:
+        """Return a column of the price data resampled to a higher interval and aligned on its rows. A higher
+           timeframe bar is seen only from the base bar that closes it. Columns attached by
+           Resampler.read_timeframes() are used as they are."""
+        name = f"{column}_{interval}"
+        if name in self.price_data.columns:
+            return self.price_data[name]
+
+        if (interval, column) not in self._timeframes:
+            higher_frame = resample_ohlcv(self.price_data, interval)
+            self._timeframes[(interval, column)] = align_timeframes(self.price_data, higher_frame, interval,
+                                                                    [column], base_interval)[name]
+        return self._timeframes[(interval, column)]
+
+    def get_params(self) -> dict:
+        return {}
+
+    def get_required_indicators(self) -> list:
+        """Return the (indicator, window) pairs the strategy reads with its parameters, so batch runs can compute
+           the shared indicators once for all strategies."""
+        return []
+
+    @classmethod
+    def is_valid_params(cls, params: dict) -> bool:
+        return True
+
+    @classmethod
+    def get_param_grid(cls, **param_space) -> list:
+        """Return the valid parameter combinations of PARAM_SPACE, updated with the given values lists."""
+        param_space = {**cls.PARAM_SPACE, **param_space}
+        combinations = [dict(zip(param_space, values)) for values in itertools.product(*param_space.values())]
+
+        return [params for params in combinations if cls.is_valid_params(params)]
+
+    def get_position(self, signal: pd.Series) -> pd.Series:
+        # The position follows the signal change of the previous bar
+        # (the first two rows of every pair have no previous change and stay flat)
+        return self.group(self.group(signal).diff()).shift(1).fillna(0)
+
+    def get_signals(self) -> pd.DataFrame:
+        # Signals are computed once per strategy object
+        if self._signals is None:
+            with stage_tracker.stage("strategy.signals", strategy=type(self).__name__,
+                                     rows=len(self.price_data)):
+                self._signals = self.generate_signals()
+        return self._signals
+
+    def get_signal_matrices(self, close: pd.DataFrame = None):
+        """Return the close and signal matrices with a column per trading pair. A close matrix pivoted
+           from the same price data may be passed in to be reused."""
+        signal = self.get_signals()['signal'].astype(bool)
+        if 'symbol' not in self.price_data.columns:
+            return self.price_data[['close']], signal.to_frame('close')
+
+        if close is None:
+            close = DataLoader.pivot(self.price_data, 'close').ffill()
+        signal_data = pd.DataFrame({'timestamp': self.price_data['timestamp'], 'symbol': self.price_data['symbol'],
+                                    'signal': signal})
+        signal = DataLoader.pivot(signal_data, 'signal').reindex_like(close).fillna(False).astype(bool)
+
+        return close, signal
+
+    def get_stream_state(self, bar) -> dict:
+        # Every trading pair keeps its own streaming state
+        symbol = bar.get('symbol')
+        if symbol not in self._stream_states:
+            self._stream_states[symbol] = self.create_stream_state()
+        return self._stream_states[symbol]
+
+    def create_stream_state(self) -> dict:
+        raise NotImplementedError(f"{type(self).__name__} has no streaming mode.")
+
+    def update(self, bar) -> dict:
+        """Take one new bar (a mapping with 'close' and optionally 'symbol') and return its 'signal' and 'position'.
+           The signal comes from incremental indicator state and is the same as the one of generate_signals()."""
+        raise NotImplementedError(f"{type(self).__name__} has no streaming mode.")
 
     @abstractmethod
     def generate_signals(self) -> pd.DataFrame:
+        """Return a frame aligned with price_data with the 'signal' and 'position' columns."""
         pass
 
     @abstractmethod
     def run_backtest(self) -> pd.DataFrame:
         pass
 
-    @abstractmethod
-    def get_metrics(self) -> dict:
-        pass
+    def get_metrics(self, close: pd.DataFrame = None, signal: pd.DataFrame = None, freq: str = '1min') -> dict:
+        """Simulate the signals with the compiled engine and return the metrics of the strategy, with the Sharpe
+           ratio annualized for the bar frequency freq. For a symbol-tagged frame the metrics are averaged over
+           the trading pairs. The matrices of get_signal_matrices() may be passed in to be reused."""
+        from core import engine
+
+        if signal is None:
+            close, signal = self.get_signal_matrices(close)
+        metrics = compute_simulation_metrics(engine.simulate(close, signal), freq=freq)
+
+        return {name: float(value) for name, value in metrics.mean().items()}
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from strategies.base import StrategyBase
+from strategies.indicators import IndicatorCache
+from strategies.registry import register
+
+
+@register
+class BollingerReversion(StrategyBase):
+    """BollingerReversion class is a mean reversion strategy: a position is opened when the close falls
+       below the lower Bollinger band and held until the close gets back to the middle band."""
+    NAME = 'bollinger'
+    PARAM_SPACE = {'window': [20, 50, 100], 'num_std': [1.5, 2.0, 2.5]}
+
+    def __init__(self, price_data: pd.DataFrame, window: int = 20, num_std: float = 2.0,
+                 indicator_cache: IndicatorCache = None):
+        super().__init__(price_data, indicator_cache)
+        self.window = window
+        self.num_std = num_std
+
+    def __str__(self):
+        return f"Bollinger Reversion Strategy \n(window={self.window}, num_std={self.num_std})"
+
+    def get_params(self) -> dict:
+        return {'window': self.window, 'num_std': self.num_std}
+
+    def get_required_indicators(self) -> list:
+        return [('sma', self.window), ('std', self.window)]
+
+    def get_bands(self):
+        middle_band = self.get_indicator('sma', self.window)
+        width = self.num_std * self.get_indicator('std', self.window)
+
+        return middle_band - width, middle_band, middle_band + width
+
+    def generate_signals(self) -> pd.DataFrame:
+        close = self.price_data['close']
+        lower_band, middle_band, _ = self.get_bands()
+        # Mark the bars that open (1) or close (0) a position and carry the last mark forward within every pair
+        # (bars before the bands are defined compare as False and stay flat)
+        marks = pd.Series(np.where(close < lower_band, 1.0, np.where(close >= middle_band, 0.0, np.nan)),
+                          index=close.index)
+        signal = self.group(marks).ffill().fillna(0).astype(int)
+
+        return pd.DataFrame({'signal': signal, 'position': self.get_position(signal)}, index=self.price_data.index)
+
+    def run_backtest(self) -> pd.DataFrame:
+        signals = self.get_signals()
+        lower_band, middle_band, upper_band = self.get_bands()
+
+        return pd.DataFrame({
+            'close': self.price_data['close'],
+            'lower_band': lower_band,
+            'middle_band': middle_band,
+            'upper_band': upper_band,
+            'signal': signals['signal'],
+            'position': signals['position']
+        }, index=self.price_data.index)
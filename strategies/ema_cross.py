@@ -0,0 +1,50 @@
+import pandas as pd
+from strategies.base import StrategyBase
+from strategies.indicators import IndicatorCache
+from strategies.registry import register
+
+
+@register
+class EmaCrossover(StrategyBase):
+    """EmaCrossover class holds a position while the fast exponential moving average is above the slow one."""
+    NAME = 'ema_cross'
+    PARAM_SPACE = {'fast_window': [12, 26, 50], 'slow_window': [26, 100, 200]}
+
+    def __init__(self, price_data: pd.DataFrame, fast_window: int = 12, slow_window: int = 26,
+                 indicator_cache: IndicatorCache = None):
+        super().__init__(price_data, indicator_cache)
+        self.fast_window = fast_window
+        self.slow_window = slow_window
+
+    def __str__(self):
+        return f"EMA Crossover Strategy \n(fast_window={self.fast_window}, slow_window={self.slow_window})"
+
+    def get_params(self) -> dict:
+        return {'fast_window': self.fast_window, 'slow_window': self.slow_window}
+
+    def get_required_indicators(self) -> list:
+        return [('ema', self.fast_window), ('ema', self.slow_window)]
+
+    @classmethod
+    def is_valid_params(cls, params: dict) -> bool:
+        return params['fast_window'] < params['slow_window']
+
+    def generate_signals(self) -> pd.DataFrame:
+        ema_fast = self.get_indicator('ema', self.fast_window)
+        ema_slow = self.get_indicator('ema', self.slow_window)
+        # The averages start at the first bar, so the first slow_window rows of every pair are skipped
+        warmed_up = self.group(self.price_data['close']).cumcount() >= self.slow_window
+        signal = ((ema_fast > ema_slow) & warmed_up).astype(int)
+
+        return pd.DataFrame({'signal': signal, 'position': self.get_position(signal)}, index=self.price_data.index)
+
+    def run_backtest(self) -> pd.DataFrame:
+        signals = self.get_signals()
+
+        return pd.DataFrame({
+            'close': self.price_data['close'],
+            'ema_fast': self.get_indicator('ema', self.fast_window),
+            'ema_slow': self.get_indicator('ema', self.slow_window),
+            'signal': signals['signal'],
+            'position': signals['position']
+        }, index=self.price_data.index)
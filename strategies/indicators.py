@@ -0,0 +1,69 @@
+import weakref
+from collections import OrderedDict
+import pandas as pd
+
+
+class IndicatorCache:
+    """IndicatorCache class memoizes the indicators requested by strategies. Every indicator is keyed by
+       (frame, column, indicator, window), so two strategies asking for the same indicator over the same price data
+       compute it once. For a symbol-tagged frame the indicators are computed within every trading pair.
+       The cache never keeps a frame alive: the indicators of a frame are dropped when it is garbage collected,
+       and with max_frames only the indicators of the most recently used frames are kept. A frame modified
+       in place must be discarded from the cache to get its indicators computed again."""
+    INDICATORS = {
+        "sma": lambda series, window: series.rolling(window=window).mean(),
+        "std": lambda series, window: series.rolling(window=window).std(),
+        "ema": lambda series, window: series.ewm(span=window, adjust=False).mean()
+    }
+
+    def __init__(self, max_frames: int = None):
+        self.max_frames = max_frames
+        # The indicators and the finalizer of every cached frame by its id, the least recently used frame first
+        self._frames = OrderedDict()
+
+    def get_frame_indicators(self, price_data: pd.DataFrame) -> dict:
+        frame_id = id(price_data)
+        if frame_id not in self._frames:
+            # The entry goes away with the frame, so its id can't be reused by another object while it is cached
+            finalizer = weakref.finalize(price_data, self._frames.pop, frame_id, None)
+            self._frames[frame_id] = ({}, finalizer)
+            if self.max_frames is not None and len(self._frames) > self.max_frames:
+                _, (_, evicted_finalizer) = self._frames.popitem(last=False)
+                evicted_finalizer.detach()
+        self._frames.move_to_end(frame_id)
+
+        return self._frames[frame_id][0]
+
+    def get(self, price_data: pd.DataFrame, indicator: str, window: int, column: str = "close") -> pd.Series:
+        """Return the indicator over the given column. The returned series is shared and must not be modified."""
+        indicators = self.get_frame_indicators(price_data)
+        key = (column, indicator, window)
+
+        if key not in indicators:
+            function = self.INDICATORS[indicator]
+            series = price_data[column]
+            if "symbol" in price_data.columns:
+                values = series.groupby(price_data["symbol"], sort=False).transform(function, window)
+            else:
+                values = function(series, window)
+            indicators[key] = values
+
+        return indicators[key]
+
+    def discard(self, price_data: pd.DataFrame):
+        """Drop the indicators of a frame, e.g. after it was modified in place."""
+        entry = self._frames.pop(id(price_data), None)
+        if entry is not None:
+            entry[1].detach()
+
+    def __len__(self):
+        return sum(len(indicators) for indicators, _ in list(self._frames.values()))
+
+    def clear(self):
+        for _, finalizer in list(self._frames.values()):
+            finalizer.detach()
+        self._frames.clear()
+
+
+# The cache shared by all strategies that aren't given their own one, bounded to the last few frames
+shared_indicator_cache = IndicatorCache(max_frames=8)
@@ -0,0 +1,35 @@
+import importlib
+
+# Modules with the built-in strategies, imported on the first registry lookup
+BUILTIN_MODULES = ["strategies.sma_cross", "strategies.ema_cross", "strategies.bollinger"]
+
+STRATEGIES = {}
+
+
+def register(strategy_class):
+    """Class decorator adding a strategy to the registry under its NAME."""
+    if not strategy_class.NAME:
+        raise ValueError(f"{strategy_class.__name__} has no NAME to be registered under.")
+    STRATEGIES[strategy_class.NAME] = strategy_class
+
+    return strategy_class
+
+
+def load_builtin_strategies():
+    for module_name in BUILTIN_MODULES:
+        importlib.import_module(module_name)
+
+
+def get_strategies() -> dict:
+    """Return the dict of registered strategy names and classes, sorted by name."""
+    load_builtin_strategies()
+
+    return dict(sorted(STRATEGIES.items()))
+
+
+def get_strategy(name):
+    strategies = get_strategies()
+    if name not in strategies:
+        raise ValueError(f"Unknown strategy {name}, expected one of {sorted(strategies)}.")
+
+    return strategies[name]
@@ -1,15 +1,20 @@
-import os
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from strategies.base import StrategyBase
+from strategies.indicators import IndicatorCache
+from strategies.registry import register
+from strategies.streaming import RollingMean, RollingStd, ExpandingMean
 
 
+@register
 class SmaCrossover(StrategyBase):
     """SmaCrossover class implements the classic simple moving average crossover strategy."""
-    RESULT_DIR = 'results/screenshots'
+    NAME = 'sma_cross'
+    PARAM_SPACE = {'short_window': [20, 50, 100], 'long_window': [100, 200, 400], 'volatility_window': [30]}
 
-    def __init__(self, price_data: pd.DataFrame, short_window: int = 50, long_window: int = 200, volatility_window: int = 30):
-        super().__init__(price_data)
+    def __init__(self, price_data: pd.DataFrame, short_window: int = 50, long_window: int = 200, volatility_window: int = 30,
+                 indicator_cache: IndicatorCache = None):
+        super().__init__(price_data, indicator_cache)
         self.short_window = short_window
         self.long_window = long_window
         self.volatility_window = volatility_window
@@ -19,87 +24,109 @@ class SmaCrossover(StrategyBase):
                 f"(short_window={self.short_window}, "
                 f"long_window={self.long_window}, volatility_window={self.volatility_window})")
 
+    def get_params(self) -> dict:
+        return {'short_window': self.short_window, 'long_window': self.long_window,
+                'volatility_window': self.volatility_window}
+
+    def get_required_indicators(self) -> list:
+        return [('sma', self.short_window), ('sma', self.long_window), ('std', self.volatility_window)]
+
+    @classmethod
+    def is_valid_params(cls, params: dict) -> bool:
+        return params['short_window'] < params['long_window']
+
     def generate_signals(self) -> pd.DataFrame:
-        # Calculate short and long moving averages
-        self.price_data['sma_short'] = self.price_data['close'].rolling(window=self.short_window).mean()
-        self.price_data['sma_long'] = self.price_data['close'].rolling(window=self.long_window).mean()
-        # Calculate volatility for filter
-        self.price_data['volatility'] = self.price_data['close'].rolling(window=self.volatility_window).std()
-        average_volatility = self.price_data['volatility'].mean()
-        # Set signals
-        self.price_data['signal'] = 0
-        condition = ((self.price_data['sma_short'] > self.price_data['sma_long']) &
-                     (self.price_data['volatility'] > average_volatility))
-        self.price_data.loc[self.short_window:, 'signal'] = condition[self.short_window:].astype(int)
+        # Get short and long moving averages
+        sma_short = self.get_indicator('sma', self.short_window)
+        sma_long = self.get_indicator('sma', self.long_window)
+        # Get volatility for filter
+        volatility = self.get_indicator('std', self.volatility_window)
+        # (the average volatility only covers the bars seen so far, so there is no look-ahead)
+        average_volatility = self.group(volatility).transform(lambda values: values.expanding().mean())
+        # Set signals, skipping the first short_window rows of every pair
+        condition = (sma_short > sma_long) & (volatility > average_volatility)
+        warmed_up = self.group(self.price_data['close']).cumcount() >= self.short_window
+        signal = (condition & warmed_up).astype(int)
         # Set position based on signal changes and shift them
-        self.price_data['position'] = 0
-        self.price_data['position'] = self.price_data['signal'].diff().shift(1)
-        self.price_data.loc[[0,1], 'position'] = 0
-
-        return self.price_data
+        position = self.get_position(signal)
+
+        return pd.DataFrame({'signal': signal, 'position': position}, index=self.price_data.index)
+
+    def create_stream_state(self) -> dict:
+        return {
+            'bars': 0,
+            'sma_short': RollingMean(self.short_window),
+            'sma_long': RollingMean(self.long_window),
+            'volatility': RollingStd(self.volatility_window),
+            'average_volatility': ExpandingMean(),
+            'signal': 0,
+            'signal_change': 0
+        }
+
+    def update(self, bar) -> dict:
+        state = self.get_stream_state(bar)
+        close = float(bar['close'])
+        # Update the rolling indicators with the new close
+        sma_short = state['sma_short'].update(close)
+        sma_long = state['sma_long'].update(close)
+        volatility = state['volatility'].update(close)
+        average_volatility = state['average_volatility'].update(volatility)
+        # Set the signal the same way as generate_signals
+        signal = int(state['bars'] >= self.short_window and sma_short > sma_long and volatility > average_volatility)
+        # The position follows the signal change of the previous bar
+        position = state['signal_change'] if state['bars'] >= 2 else 0
+        state['signal_change'] = signal - state['signal'] if state['bars'] >= 1 else 0
+        state['signal'] = signal
+        state['bars'] += 1
+
+        return {'signal': signal, 'position': float(position)}
+
+    @classmethod
+    def sweep_signals(cls, close: pd.Series, short_windows, long_windows, volatility_windows) -> pd.DataFrame:
+        """Build a (time x parameter combination) signal matrix for the whole grid at once.
+           Every distinct rolling mean and std is computed a single time and shared by all combinations."""
+        combinations = pd.MultiIndex.from_tuples(
+            [(short, long, volatility)
+             for short in short_windows for long in long_windows for volatility in volatility_windows
+             if short < long],
+            names=["short_window", "long_window", "volatility_window"])
+        if combinations.empty:
+            raise ValueError("The grid has no combination with short_window < long_window.")
+
+        # Compute every distinct moving average and volatility filter once
+        sma_windows = sorted(set(combinations.get_level_values("short_window")) |
+                             set(combinations.get_level_values("long_window")))
+        volatility_windows = sorted(set(combinations.get_level_values("volatility_window")))
+        sma_matrix = np.column_stack([close.rolling(window=window).mean().to_numpy() for window in sma_windows])
+        volatility_matrix = np.column_stack([close.rolling(window=window).std().to_numpy()
+                                             for window in volatility_windows])
+        volatility_filter = volatility_matrix > pd.DataFrame(volatility_matrix).expanding().mean().to_numpy()
+
+        # Broadcast the crossover conditions into one matrix, a column per combination
+        sma_position = {window: i for i, window in enumerate(sma_windows)}
+        volatility_position = {window: i for i, window in enumerate(volatility_windows)}
+        short_index = [sma_position[window] for window in combinations.get_level_values("short_window")]
+        long_index = [sma_position[window] for window in combinations.get_level_values("long_window")]
+        volatility_index = [volatility_position[window]
+                            for window in combinations.get_level_values("volatility_window")]
+        with np.errstate(invalid='ignore'):
+            signals = ((sma_matrix[:, short_index] > sma_matrix[:, long_index]) &
+                       volatility_filter[:, volatility_index])
+        # Skip the first short_window rows of every combination
+        warm_up = np.arange(len(close))[:, None] < combinations.get_level_values("short_window").to_numpy()
+        signals[warm_up] = False
+
+        return pd.DataFrame(signals, index=close.index, columns=combinations)
 
     def run_backtest(self) -> pd.DataFrame:
-        # If the generate_signals method wasn't called yet the signal column is not set
-        if 'signal' not in self.price_data.columns:
-            self.generate_signals()
-
-        active_rows = self.price_data[((self.price_data['position'] != 0) |
-                                       ((self.price_data['position'] == 0) & (self.price_data['signal'] != 0)))]
-
-        # Build curve
-        plt.figure(figsize=(12, 8))
-        plt.ylim(0, 0.005)
-        plt.plot(active_rows['close'], label='Close Price')
-        plt.plot(active_rows['sma_short'], label='Short SMA - 50 minuets')
-        plt.plot(active_rows['sma_long'], label='Long SMA - 200 minuets')
-        plt.plot(active_rows[active_rows['position'] == 1].index,
-                 active_rows['sma_short'][active_rows['position'] == 1], '^', markersize=3, color='b', label='Signal to buy')
-        plt.plot(active_rows[active_rows['position'] == -1].index,
-                 active_rows['sma_short'][active_rows['position'] == -1], 'v', markersize=3, color='r', label='Signal to sell')
-
-        plt.title(f"BTC {self}")
-        plt.xlabel('February 2025')
-        plt.ylabel('Price')
-        plt.legend(loc='upper right')
-        os.makedirs(self.RESULT_DIR, exist_ok=True)
-        plt.savefig(os.path.join(self.RESULT_DIR, f"sma_curve.png"))
-
-        return self.price_data
-
-    def get_metrics(self) -> dict:
-        metrics_dict = {}
-        # If the generate_signals method wasn't called yet the position column is not set
-        if 'position' not in self.price_data.columns:
-            self.generate_signals()
-        # Set returns
-        self.price_data['returns'] = self.price_data['close'].pct_change().fillna(0)
-        # Calculate a profit/loss for the active positions
-        self.price_data['strategy_profit'] = self.price_data['position'] * self.price_data['returns']
-
-        # The total return metric
-        metrics_dict['total_return'] = float(self.price_data['returns'].sum())
-
-        # The Sharpe ratio metric
-        metrics_dict['sharpe_ratio'] = float(self.price_data['returns'].mean() / self.price_data['returns'].std())
-
-        # The max drawdown metric
-        peak_prices = self.price_data['close'].cummax()
-        metrics_dict['max_drawdown'] = float(((self.price_data['close'] - peak_prices) / peak_prices).min())
-
-        # The winrate metric
-        win_trades = self.price_data[self.price_data['strategy_profit'] > 0].shape[0]
-        total_trades = self.price_data[self.price_data['position'].diff() != 0].shape[0]
-        winrate = win_trades / total_trades if total_trades > 0 else 0
-        metrics_dict['winrate'] = winrate
-
-        # The expectancy metric
-        avg_win = self.price_data[self.price_data['strategy_profit'] > 0]['strategy_profit'].mean()
-        avg_loss = self.price_data[self.price_data['strategy_profit'] < 0]['strategy_profit'].mean()
-        lossrate= 1 - winrate
-        metrics_dict['expectancy'] = float((winrate * avg_win) - (lossrate * avg_loss))
-
-        # The exposure time metric
-        time_in_position = self.price_data[self.price_data['position'] != 0].shape[0]
-        metrics_dict['exposure_time']  = time_in_position / len(self.price_data)
-
-        return metrics_dict
+        # Collect the prices, indicators and signals into a new frame (charts are drawn by core.reporting)
+        signals = self.get_signals()
+        backtest = pd.DataFrame({
+            'close': self.price_data['close'],
+            'sma_short': self.get_indicator('sma', self.short_window),
+            'sma_long': self.get_indicator('sma', self.long_window),
+            'signal': signals['signal'],
+            'position': signals['position']
+        }, index=self.price_data.index)
+
+        return backtest
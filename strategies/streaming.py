@@ -0,0 +1,66 @@
+import math
+from collections import deque
+
+
+class RollingMean:
+    """RollingMean class keeps the mean of the last window values in O(1) per update with a ring buffer
+       and a running sum. Like pandas rolling, the value is NaN until the window is full."""
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+
+    def update(self, value: float) -> float:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+        return self.total / self.window if len(self.values) == self.window else math.nan
+
+
+class RollingStd:
+    """RollingStd class keeps the sample standard deviation of the last window values in O(1) per update
+       with a windowed Welford algorithm: the oldest value is removed from the mean and the sum of squared
+       deviations before the new one is added."""
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+
+    def update(self, value: float) -> float:
+        if len(self.values) == self.window:
+            oldest = self.values[0]
+            count = self.window - 1
+            if count:
+                old_mean = self.mean
+                self.mean = (self.mean * self.window - oldest) / count
+                self.squared_deviations -= (oldest - old_mean) * (oldest - self.mean)
+            else:
+                self.mean = 0.0
+                self.squared_deviations = 0.0
+        self.values.append(value)
+
+        count = len(self.values)
+        delta = value - self.mean
+        self.mean += delta / count
+        self.squared_deviations += delta * (value - self.mean)
+
+        if count < self.window or self.window < 2:
+            return math.nan
+        return math.sqrt(max(self.squared_deviations, 0.0) / (self.window - 1))
+
+
+class ExpandingMean:
+    """ExpandingMean class keeps the mean of all values seen so far, skipping NaN like pandas expanding."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, value: float) -> float:
+        if not math.isnan(value):
+            self.count += 1
+            self.total += value
+
+        return self.total / self.count if self.count else math.nan
@@ -0,0 +1,7 @@
+import numpy as np
+
+
+def random_walk(seed, shape=1440):
+    """Return a noisy random walk of close prices starting around 0.03, one walk per column for a 2-D shape."""
+    random_generator = np.random.default_rng(seed)
+    return 0.03 * np.cumprod(1 + random_generator.normal(0, 0.002, shape), axis=0)
@@ -1,10 +1,26 @@
 import os
 import shutil
+import tempfile
 import unittest
 import numpy as np
 import pandas as pd
-from unittest.mock import MagicMock
+from unittest.mock import patch
 from core.backtester import Backtester
+from core.data_loader import DataLoader
+from strategies.base import StrategyBase
+
+
+class FixedSignalStrategy(StrategyBase):
+    """FixedSignalStrategy class gives the signal it was created with."""
+    def __init__(self, price_data, signal):
+        super().__init__(price_data)
+        self.signal = np.asarray(signal)
+
+    def generate_signals(self):
+        return pd.DataFrame({"signal": self.signal, "position": 0}, index=self.price_data.index)
+
+    def run_backtest(self):
+        return self.price_data[["close"]]
 
 
 class TestBacktester(unittest.TestCase):
@@ -12,38 +28,100 @@ class TestBacktester(unittest.TestCase):
     def setUp(self):
         # Create a frame of 1440 (24 hours in minutes) lines with close prices in increasing tendency
         self.price_data = pd.DataFrame({
-            "close": [0.03 + i * 0.0001 for i in range(1440)],
-            'signal': np.random.choice([0, 1], size=1440, p=[0.95, 0.05])
+            "close": [0.03 + i * 0.0001 for i in range(1440)]
         })
-        # Create metrics that a strategy can return
-        self.metrics = {
-            'total_return': 10.98,
-            'sharpe_ratio':0.015,
-            'max_drawdown': -0.5,
-            'winrate': 0.13,
-            'expectancy': 0.003,
-            'exposure_time': 0.0004
-        }
-        # Create mock strategy
-        self.mock_strategy = MagicMock()
-        self.mock_strategy.get_metrics.return_value = self.metrics
-        self.mock_strategy.run_backtest.return_value = None
+        self.signal = np.random.choice([0, 1], size=1440, p=[0.95, 0.05])
+        self.strategy = FixedSignalStrategy(self.price_data, self.signal)
         # Create a Backtester object
-        self.backtester = Backtester(self.price_data, self.mock_strategy)
+        self.backtester = Backtester(self.price_data, self.strategy)
+
+        # Write the results into a temporary directory instead of the tracked results folder
+        self.result_dir = tempfile.mkdtemp()
+        result_dir_patch = patch.object(Backtester, "RESULT_DIR", self.result_dir)
+        result_dir_patch.start()
+        self.addCleanup(result_dir_patch.stop)
 
-        # Clean the output directory before testing
-        if os.path.exists("results"):
-            shutil.rmtree("results")
+    def tearDown(self):
+        shutil.rmtree(self.result_dir)
 
     def test_get_backtest_results(self):
         metrics, result = self.backtester.get_backtest_results()
 
         # Test the metrics return
-        self.assertEqual(metrics, self.metrics)
+        self.assertEqual(list(metrics), ["total_return", "sharpe_ratio", "max_drawdown", "winrate", "expectancy",
+                                         "exposure_time", "total_trades"])
+        self.assertAlmostEqual(metrics["total_return"], result)
         # Test if csv file was created
-        self.assertTrue(os.path.exists(os.path.join("results", "metrics.csv")))
+        self.assertTrue(os.path.exists(os.path.join(self.result_dir, "metrics.csv")))
         # Test if portfolio total_return is float
         self.assertIsInstance(result, float)
+        # Test that the price frame was left untouched
+        self.assertEqual(list(self.price_data.columns), ["close"])
+
+    def test_get_backtest_results_numba_engine(self):
+        vectorbt_result = self.backtester.get_backtest_results()[1]
+        numba_backtester = Backtester(self.price_data, self.strategy, engine="numba")
+        metrics, result = numba_backtester.get_backtest_results()
+
+        # Test that both engines agree on the portfolio result
+        self.assertIsInstance(result, float)
+        self.assertAlmostEqual(result, vectorbt_result)
+
+    def test_engines_report_the_same_metrics(self):
+        close, signal = self.strategy.get_signal_matrices()
+        results = [Backtester(self.price_data, self.strategy, engine=engine_name, fees=0.001).run_portfolio(close,
+                                                                                                       signal)
+                   for engine_name in Backtester.ENGINES]
+
+        pd.testing.assert_frame_equal(results[0], results[1], check_exact=False, rtol=1e-6)
+
+    def test_metrics_follow_the_trading_costs(self):
+        backtester = Backtester(self.price_data, self.strategy, engine="numba", fees=0.002, stop_loss=0.01)
+        metrics, result = backtester.get_backtest_results()
+
+        # Test that the strategy metrics summarize the portfolio with its costs
+        self.assertAlmostEqual(metrics["total_return"], result)
+
+    def test_get_backtest_results_freq(self):
+        close, signal = self.strategy.get_signal_matrices()
+        minute_sharpe = self.backtester.run_portfolio(close, signal)["sharpe_ratio"].iloc[0]
+
+        # Test that both engines annualize the Sharpe ratio for the bar frequency
+        for engine_name in Backtester.ENGINES:
+            backtester = Backtester(self.price_data, self.strategy, engine=engine_name, freq="5min")
+            sharpe_ratio = backtester.run_portfolio(close, signal)["sharpe_ratio"].iloc[0]
+            self.assertAlmostEqual(sharpe_ratio, minute_sharpe / np.sqrt(5))
+        metrics, _ = backtester.get_backtest_results()
+        self.assertAlmostEqual(metrics["sharpe_ratio"], minute_sharpe / np.sqrt(5))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Backtester(self.price_data, self.strategy, engine="unknown")
+
+    def test_get_backtest_results_multi_symbol(self):
+        # Stack two pairs with the same timestamps into one symbol-tagged frame
+        timestamps = [1740787200000 + i * 60000 for i in range(1440)]
+        price_data = pd.concat([
+            pd.DataFrame({"timestamp": timestamps, "close": self.price_data["close"], "symbol": symbol})
+            for symbol in ["ETHBTC", "SOLBTC"]
+        ], ignore_index=True)
+        backtester = Backtester(price_data, FixedSignalStrategy(price_data, np.tile(self.signal, 2)))
+        metrics, result = backtester.get_backtest_results()
+
+        # Test that every pair got its own portfolio column
+        self.assertEqual(list(result.index), ["ETHBTC", "SOLBTC"])
+        self.assertIn("total_return", result.columns)
+        self.assertAlmostEqual(result.loc["ETHBTC", "total_return"], result.loc["SOLBTC", "total_return"])
+        self.assertTrue(os.path.exists(os.path.join(self.result_dir, "symbol_metrics.csv")))
+
+        # Test that a close matrix passed in is used instead of pivoting the prices again
+        close_matrix = pd.DataFrame({"ETHBTC": self.price_data["close"], "SOLBTC": self.price_data["close"]})
+        close_matrix.index = pd.DatetimeIndex(pd.to_datetime(timestamps, unit="ms"), name="timestamp")
+        strategy = FixedSignalStrategy(price_data, np.tile(self.signal, 2))
+        with patch.object(DataLoader, "pivot", wraps=DataLoader.pivot) as pivot:
+            matrix_result = Backtester(price_data, strategy, close_matrix=close_matrix).get_backtest_results()[1]
+        self.assertEqual([call.args[1] for call in pivot.call_args_list], ["signal"])
+        pd.testing.assert_frame_equal(matrix_result, result)
 
 
 if __name__ == '__main__':
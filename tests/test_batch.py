@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import pandas as pd
+from core.backtester import Backtester
+from core.batch import BatchRunner
+from core.runner import BacktestJob
+from strategies import registry
+from strategies.bollinger import BollingerReversion
+from strategies.ema_cross import EmaCrossover
+from strategies.sma_cross import SmaCrossover
+from tests.helpers import random_walk
+
+
+class VolumeStrategy(EmaCrossover):
+    REQUIRED_COLUMNS = ('close', 'volume')
+
+
+class TestRegistry(unittest.TestCase):
+    def test_get_strategy(self):
+        self.assertEqual(registry.get_strategies(), {"sma_cross": SmaCrossover, "ema_cross": EmaCrossover,
+                                                     "bollinger": BollingerReversion})
+        with self.assertRaises(ValueError):
+            registry.get_strategy("unknown")
+
+    def test_get_param_grid(self):
+        # Test that invalid combinations are left out of the parameter space
+        grid = SmaCrossover.get_param_grid(short_window=[20, 100], long_window=[50, 100])
+        self.assertEqual(grid, [{"short_window": 20, "long_window": 50, "volatility_window": 30},
+                                {"short_window": 20, "long_window": 100, "volatility_window": 30}])
+        self.assertEqual(len(BollingerReversion.get_param_grid()), 9)
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        timestamps = pd.date_range("2025-02-01", periods=1440, freq="1min")
+        close = random_walk(18, (1440, 2))
+        self.price_data = pd.concat([
+            pd.DataFrame({"timestamp": timestamps, "symbol": symbol, "close": close[:, number]})
+            for number, symbol in enumerate(["ETHBTC", "SOLBTC"])], ignore_index=True)
+
+    def test_run(self):
+        batch_runner = BatchRunner(self.price_data, engine="numba")
+        results = batch_runner.run(BatchRunner.get_jobs())
+
+        # Test that every strategy reported every pair
+        self.assertEqual(results[["strategy", "symbol"]].values.tolist(),
+                         [["bollinger", "ETHBTC"], ["bollinger", "SOLBTC"], ["ema_cross", "ETHBTC"],
+                          ["ema_cross", "SOLBTC"], ["sma_cross", "ETHBTC"], ["sma_cross", "SOLBTC"]])
+        self.assertTrue((results["job_time"] > 0).all())
+        # Test that the shared indicators were computed once: sma 50/200/20, std 30/20 and ema 12/26
+        self.assertEqual(len(batch_runner.indicator_cache), 7)
+
+        # Test that a batch job matches a standalone backtest of the same strategy
+        strategy = BollingerReversion(self.price_data)
+        expected = Backtester(self.price_data, strategy, engine="numba").run_portfolio(
+            *strategy.get_signal_matrices())
+        np.testing.assert_allclose(results.loc[results["strategy"] == "bollinger", "total_return"],
+                                   expected["total_return"])
+
+    def test_run_symbols_and_missing_columns(self):
+        results = BatchRunner(self.price_data).run([BacktestJob(EmaCrossover, {"fast_window": 5}, ["SOLBTC"])])
+        self.assertEqual(results["symbol"].tolist(), ["SOLBTC"])
+        self.assertEqual(results["params"].tolist(), ["{'fast_window': 5, 'slow_window': 26}"])
+
+        with self.assertRaises(ValueError):
+            BatchRunner(self.price_data).run([BacktestJob(VolumeStrategy, {}, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import copy
+import shutil
+import tempfile
+import unittest
+from core.data_loader import CsvLoader
+from benchmarks.pipeline import compare, generate_dataset, run_benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_generate_dataset(self):
+        data_dir = tempfile.mkdtemp()
+        try:
+            paths_to_zips = generate_dataset(data_dir, symbols=2, year_months=["2025-02"], interval="1h")
+
+            # Test that the archives parse like real Binance archives
+            self.assertEqual(len(paths_to_zips), 2)
+            data_frame = CsvLoader.read_ohlcv_zip(paths_to_zips[0])
+            self.assertEqual(len(data_frame), 28 * 24)
+            self.assertEqual(str(data_frame["timestamp"].iloc[1]), "2025-02-01 01:00:00")
+            self.assertTrue((data_frame["high"] >= data_frame[["open", "close"]].max(axis=1)).all())
+        finally:
+            shutil.rmtree(data_dir)
+
+    def test_run_benchmark(self):
+        results = run_benchmark(symbols=2, interval="15m", repeat=1, engine="numba")
+
+        self.assertEqual(list(results["stages"]), ["load", "signals", "backtest"])
+        self.assertEqual(results["config"]["rows"], 2 * 28 * 96)
+        for record in results["stages"].values():
+            self.assertGreater(record["seconds"], 0)
+            self.assertGreater(record["peak_mb"], 0)
+
+        # Test that only slowdowns over the threshold are reported
+        slower = copy.deepcopy(results)
+        slower["stages"]["signals"]["seconds"] *= 1.5
+        slower["stages"]["load"]["seconds"] *= 1.1
+        self.assertEqual(compare(results, results), [])
+        self.assertEqual([(r["stage"], r["measure"]) for r in compare(slower, results, threshold=0.2)],
+                         [("signals", "seconds")])
+
+        slower["config"]["symbols"] = 3
+        with self.assertRaises(ValueError):
+            compare(slower, results)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from core.cache import MatrixCache
+from core.store import ParquetStore
+
+
+class TestMatrixCache(unittest.TestCase):
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.cache = MatrixCache(os.path.join(self.root_dir, "cache"))
+        index = pd.date_range("2025-02-01", periods=100, freq="1min", name="timestamp")
+        columns = pd.Index(["ETHBTC", "SOLBTC"], name="symbol")
+        self.matrices = {
+            "close": pd.DataFrame(np.random.rand(100, 2), index=index, columns=columns),
+            "volume": pd.DataFrame(np.random.rand(100, 2), index=index, columns=columns)
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.root_dir)
+
+    def test_put_get(self):
+        key = MatrixCache.get_key("test", 1)
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.put(key, self.matrices)
+        matrices = self.cache.get(key)
+
+        # Test that the matrices come back equal and memory-mapped without a copy
+        for name, matrix in self.matrices.items():
+            pd.testing.assert_frame_equal(matrices[name], matrix, check_freq=False)
+            array = matrices[name].values
+            while array is not None and not isinstance(array, np.memmap):
+                array = array.base
+            self.assertIsInstance(array, np.memmap)
+
+    def test_evict(self):
+        self.cache.put(MatrixCache.get_key(0), self.matrices)
+        self.cache.max_bytes = int(self.cache.get_size() * 2.5)
+        for number in range(3):
+            self.cache.put(MatrixCache.get_key(number), self.matrices)
+            # Make the access times distinct regardless of the file system resolution
+            os.utime(self.cache.get_path(MatrixCache.get_key(number)), (number, number))
+            if number == 1:
+                self.cache.get(MatrixCache.get_key(0))
+
+        # The least recently used entry (1) was evicted, the recently read one (0) was kept
+        self.assertIsNotNone(self.cache.get(MatrixCache.get_key(0)))
+        self.assertIsNone(self.cache.get(MatrixCache.get_key(1)))
+        self.assertIsNotNone(self.cache.get(MatrixCache.get_key(2)))
+
+    def test_get_matrices(self):
+        store = ParquetStore(os.path.join(self.root_dir, "store"))
+        for symbol in ["ETHBTC", "SOLBTC"]:
+            store.write_partition(pd.DataFrame({"timestamp": self.matrices["close"].index,
+                                                "close": self.matrices["close"][symbol],
+                                                "volume": self.matrices["volume"][symbol]}),
+                                  symbol, "1m", "2025-02")
+
+        matrices = self.cache.get_matrices(store, ["ETHBTC", "SOLBTC"], "1m", ["2025-02"])
+        pd.testing.assert_frame_equal(matrices["close"], self.matrices["close"], check_freq=False)
+
+        # Rewriting a partition changes the content hash, so the matrices are built again
+        store.write_partition(pd.DataFrame({"timestamp": self.matrices["close"].index, "close": 1.0,
+                                            "volume": 1.0}), "ETHBTC", "1m", "2025-02", overwrite=True)
+        matrices = self.cache.get_matrices(store, ["ETHBTC", "SOLBTC"], "1m", ["2025-02"])
+        self.assertTrue((matrices["close"]["ETHBTC"] == 1.0).all())
+
+        # Test that all pairs and months of the store are read when none are given
+        matrices = self.cache.get_matrices(store, None, "1m", None)
+        self.assertEqual(list(matrices["close"].columns), ["ETHBTC", "SOLBTC"])
+        self.assertIsNone(self.cache.get_matrices(store, None, "5m", None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from core import engine
+from core.backtester import Backtester
+from core.chunked import ChunkedBacktester
+from core.metrics import MetricsAccumulator, compute_metrics
+from core.store import ParquetStore
+from strategies.bollinger import BollingerReversion
+from strategies.sma_cross import SmaCrossover
+from tests.helpers import random_walk
+
+
+class TestChunkedBacktester(unittest.TestCase):
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.store = ParquetStore(self.root_dir)
+        close = iter(random_walk(19, (2000, 5)).T)
+        # Three pairs over two months, SOLBTC is listed only in the second month
+        for year_month in ["2025-01", "2025-02"]:
+            for symbol in ["ETHBTC", "NEOBTC", "SOLBTC"]:
+                if symbol == "SOLBTC" and year_month == "2025-01":
+                    continue
+                month = pd.DataFrame({
+                    "timestamp": pd.date_range(f"{year_month}-01", periods=2000, freq="1min"),
+                    "close": next(close)
+                })
+                self.store.write_partition(month, symbol, "1m", year_month)
+
+    def tearDown(self):
+        shutil.rmtree(self.root_dir)
+
+    def assert_matches_backtester(self, strategy_class, params, **costs):
+        chunked_metrics = ChunkedBacktester(self.store, strategy_class, params, symbols_per_chunk=2,
+                                            **costs).run()
+
+        # Test that the chunked run gives the same metrics as the whole frame in memory
+        price_data = self.store.read(interval="1m", columns=["close"])
+        strategy = strategy_class(price_data, **params)
+        expected = Backtester(price_data, strategy, engine="numba", **costs).run_portfolio(
+            *strategy.get_signal_matrices())
+        self.assertEqual(chunked_metrics.index.tolist(), ["ETHBTC", "NEOBTC", "SOLBTC"])
+        for column in expected.columns:
+            np.testing.assert_allclose(chunked_metrics[column], expected[column], rtol=1e-9, err_msg=column)
+        self.assertGreater(chunked_metrics["total_trades"].min(), 0)
+
+    def test_run(self):
+        self.assert_matches_backtester(SmaCrossover, {"short_window": 30, "long_window": 80,
+                                                      "volatility_window": 10})
+
+    def test_run_with_costs_and_held_positions(self):
+        self.assert_matches_backtester(BollingerReversion, {"window": 50}, fees=0.001, stop_loss=0.01)
+
+    def test_run_without_data(self):
+        with self.assertRaises(ValueError):
+            ChunkedBacktester(self.store, SmaCrossover, interval="1h").run()
+
+
+class TestMetricsAccumulator(unittest.TestCase):
+    def test_update(self):
+        random_generator = np.random.default_rng(3)
+        close = 1 + np.cumsum(random_generator.normal(0, 0.01, (1000, 2)), axis=0)
+        entries = random_generator.random((1000, 2)) > 0.5
+        full = engine.simulate(close, entries)
+
+        # Test that a series fed in uneven chunks gives the metrics of the whole series
+        state = engine.create_state(2)
+        accumulator = MetricsAccumulator(2)
+        for start, end in [(0, 1), (1, 400), (400, 401), (401, 1000)]:
+            equity, trades, bars_in_position = engine.simulate_chunk(close[start:end], entries[start:end], state,
+                                                                     start)
+            accumulator.update(equity, trades[:, 0], trades[:, 7], bars_in_position)
+
+        expected = compute_metrics(full.equity, full.trades["column"], full.trades["return"], full.exposure, 100.0)
+        pd.testing.assert_frame_equal(accumulator.get_metrics(), expected, rtol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
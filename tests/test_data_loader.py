@@ -1,6 +1,33 @@
+import io
+import os
+import hashlib
+import zipfile
+import shutil
+import tempfile
+import threading
 import unittest
+import numpy as np
+import pandas as pd
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from unittest.mock import patch, mock_open, MagicMock
 from core.data_loader import *
+from core.store import ParquetStore
+
+
+class FlakyRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the files of the server directory, answering the first request of every path with 503."""
+    def do_GET(self):
+        self.server.requested_paths.append(self.path)
+        if self.server.requested_paths.count(self.path) == 1:
+            self.send_error(503)
+            return
+        super().do_GET()
+
+    def translate_path(self, path):
+        return os.path.join(self.server.root_dir, path.lstrip("/"))
+
+    def log_message(self, format, *args):
+        pass
 
 
 class TestJsonLoader(unittest.TestCase):
@@ -58,5 +85,161 @@ class TestTopLiquidLoader(unittest.TestCase):
         self.assertEqual(top_pair, [{"pair": "ETHBTC", "volume": 1317.6979}])
 
 
+class TestJsonLoaderCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.url = "http://test_url.com/ticker"
+        self.data = [{"symbol": "ETHBTC", "quoteVolume": "1317.6979"}]
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    @staticmethod
+    def make_response(status_code, data=None, etag=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = {"ETag": etag} if etag else {}
+        response.content = b"payload"
+        response.json.return_value = data
+        return response
+
+    @patch('core.data_loader.requests.get')
+    def test_get_json_cached(self, mock_get):
+        mock_get.return_value = self.make_response(200, self.data, etag='"v1"')
+        loader = JsonLoader(self.url, cache_dir=self.cache_dir, ttl=3600)
+
+        # Test that a fresh cached response is reused without a request
+        self.assertEqual(loader.get_json(), self.data)
+        self.assertEqual(loader.get_json(), self.data)
+        self.assertEqual(mock_get.call_count, 1)
+
+        # Test that an expired response is revalidated with its ETag and kept on 304
+        loader.ttl = 0
+        mock_get.return_value = self.make_response(304)
+        self.assertEqual(loader.get_json(), self.data)
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+
+        # Test that the cached response is used when the exchange can't be reached
+        mock_get.side_effect = requests.exceptions.ConnectionError("no network")
+        self.assertEqual(loader.get_json(), self.data)
+
+    @patch('core.data_loader.requests.get')
+    def test_get_json_offline(self, mock_get):
+        mock_get.return_value = self.make_response(200, self.data)
+        JsonLoader(self.url, cache_dir=self.cache_dir).get_json()
+
+        # Test that the offline mode never makes requests, however old the cache is
+        offline_loader = JsonLoader(self.url, cache_dir=self.cache_dir, ttl=0, offline=True)
+        self.assertEqual(offline_loader.get_json(), self.data)
+        self.assertEqual(mock_get.call_count, 1)
+        with self.assertRaises(LookupError):
+            offline_loader.get_json("http://test_url.com/uncached")
+
+
+class TestCsvLoaderBulkDownload(unittest.TestCase):
+    def setUp(self):
+        self.server_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        # Publish one archive with its checksum the way data.binance.vision lays them out
+        self.archives = {}
+        for pair in ["ETHBTC", "SOLBTC"]:
+            name = f"{pair}-1m-2025-02"
+            os.makedirs(os.path.join(self.server_dir, pair, "1m"))
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as zf:
+                zf.writestr(f"{name}.csv", "1738368000000000,1,2,0.5,1.5,10,1738368059999999,15,3,5,7,0\n")
+            path_to_zip = os.path.join(self.server_dir, pair, "1m", f"{name}.zip")
+            with open(path_to_zip, "wb") as f:
+                f.write(buffer.getvalue())
+            with open(f"{path_to_zip}.CHECKSUM", "w") as f:
+                f.write(f"{hashlib.sha256(buffer.getvalue()).hexdigest()}  {name}.zip\n")
+            self.archives[pair] = buffer.getvalue()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyRequestHandler)
+        self.server.root_dir = self.server_dir
+        self.server.requested_paths = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.data_dir_patch = patch.object(CsvLoader, "DATA_DIR", self.data_dir)
+        self.data_dir_patch.start()
+        self.csv_loader = CsvLoader(f"http://127.0.0.1:{self.server.server_port}/", max_workers=4, backoff=0)
+
+    def tearDown(self):
+        self.data_dir_patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.server_dir)
+        shutil.rmtree(self.data_dir)
+
+    def test_bulk_download(self):
+        paths_to_zips = self.csv_loader.bulk_download(["ETHBTC", "SOLBTC", "NEOBTC"], ["1m"], ["2025-02"])
+
+        # The missing NEOBTC archive is skipped, the others are retried after the 503 and verified
+        self.assertEqual(sorted(paths_to_zips), [("ETHBTC", "1m", "2025-02"), ("SOLBTC", "1m", "2025-02")])
+        for (pair, _, _), path_to_zip in paths_to_zips.items():
+            with open(path_to_zip, "rb") as f:
+                self.assertEqual(f.read(), self.archives[pair])
+            self.assertTrue(self.csv_loader.is_downloaded(path_to_zip))
+
+        # A second run finds everything on disk and sends no request
+        requests_count = len(self.server.requested_paths)
+        self.csv_loader.bulk_download(["ETHBTC", "SOLBTC"], ["1m"], ["2025-02"])
+        self.assertEqual(len(self.server.requested_paths), requests_count)
+
+    def test_bulk_download_checksum_mismatch(self):
+        with open(os.path.join(self.server_dir, "ETHBTC", "1m", "ETHBTC-1m-2025-02.zip.CHECKSUM"), "w") as f:
+            f.write(f"{'0' * 64}  ETHBTC-1m-2025-02.zip\n")
+
+        paths_to_zips = self.csv_loader.bulk_download(["ETHBTC"], ["1m"], ["2025-02"])
+
+        self.assertEqual(paths_to_zips, {})
+
+    def test_read_ohlcv_zip(self):
+        path_to_zip = self.csv_loader.bulk_download(["ETHBTC"], ["1m"], ["2025-02"])[("ETHBTC", "1m", "2025-02")]
+        data_frame = CsvLoader.read_ohlcv_zip(path_to_zip)
+
+        # Test the compact dtypes, the converted timestamps and the dropped 'ignore' column
+        self.assertNotIn("ignore", data_frame.columns)
+        self.assertEqual(data_frame["close"].dtype, np.float32)
+        self.assertEqual(data_frame["number_of_trades"].dtype, np.int64)
+        self.assertEqual(data_frame["timestamp"].iloc[0], pd.Timestamp("2025-02-01 00:00:00"))
+        self.assertEqual(data_frame["close_time"].iloc[0], pd.Timestamp("2025-02-01 00:00:59.999999"))
+        # Nothing was extracted next to the archive
+        self.assertEqual(sorted(os.listdir(self.data_dir)),
+                         ["ETHBTC-1m-2025-02.zip", "ETHBTC-1m-2025-02.zip.CHECKSUM"])
+
+    def test_update_store(self):
+        paths_to_zips = self.csv_loader.bulk_download(["ETHBTC", "SOLBTC"], ["1m"], ["2025-02"])
+        store = ParquetStore(os.path.join(self.data_dir, "store"))
+
+        with patch.object(DataLoader, "DATA_DIR", self.data_dir):
+            data_loader = DataLoader(sorted(paths_to_zips.values()))
+            # Test that only the partitions missing from the store are written
+            self.assertEqual(data_loader.update_store(store), ["ETHBTC/1m/2025-02", "SOLBTC/1m/2025-02"])
+            self.assertEqual(data_loader.update_store(store), [])
+
+        data_frame = store.read(symbols=["SOLBTC"], interval="1m", columns=["close"])
+        self.assertEqual(data_frame[["close", "symbol"]].values.tolist(), [[1.5, "SOLBTC"]])
+
+
+class TestDataLoader(unittest.TestCase):
+    def test_parse_kline_name(self):
+        self.assertEqual(parse_kline_name("data/ETHBTC-1m-2025-02.csv"), ("ETHBTC", "1m", "2025-02"))
+
+    def test_pivot(self):
+        # Two pairs with a missing bar for the second one
+        data_frame = pd.DataFrame({
+            "timestamp": [1740787200000000, 1740787260000000, 1740787200000000],
+            "close": [1.0, 2.0, 3.0],
+            "symbol": ["ETHBTC", "ETHBTC", "SOLBTC"]
+        })
+        wide = DataLoader.pivot(data_frame)
+
+        self.assertEqual(list(wide.columns), ["ETHBTC", "SOLBTC"])
+        self.assertEqual(wide.index[0], pd.Timestamp("2025-03-01 00:00:00"))
+        self.assertEqual(wide.loc[wide.index[1], "ETHBTC"], 2.0)
+        self.assertTrue(pd.isna(wide.loc[wide.index[1], "SOLBTC"]))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
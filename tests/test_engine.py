@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+from core import engine
+
+
+class TestEngine(unittest.TestCase):
+    def setUp(self):
+        # Create a (2000 minutes x 3 pairs) matrix of noisy random walks and random signals
+        random_generator = np.random.default_rng(1)
+        self.close = pd.DataFrame(np.cumprod(1 + random_generator.normal(0, 0.01, (2000, 3)), axis=0),
+                                  columns=["ETHBTC", "SOLBTC", "NEOBTC"])
+        self.signal = pd.DataFrame(random_generator.random((2000, 3)) > 0.7, columns=self.close.columns)
+
+    def test_simulate_matches_vectorbt(self):
+        for fees, slippage in [(0.0, 0.0), (0.001, 0.0005)]:
+            result = engine.simulate(self.close, self.signal, fees=fees, slippage=slippage)
+            portfolio = vbt.Portfolio.from_signals(self.close, self.signal, ~self.signal, fees=fees,
+                                                   slippage=slippage, size=1.0, size_type="percent", freq="1min")
+
+            np.testing.assert_allclose(result.equity.to_numpy(), portfolio.value().to_numpy())
+            # vectorbt also counts the trade still open at the end
+            closed_trades = portfolio.trades.closed.count()
+            self.assertEqual(result.trades.groupby("column").size().tolist(), closed_trades.tolist())
+
+    def test_stop_loss_take_profit(self):
+        close = pd.Series([1.0, 1.0, 0.85, 1.0, 1.0, 1.3, 1.3], name="ETHBTC")
+        signal = pd.Series([False, True, True, True, True, True, True])
+
+        # The stop-loss closes the position at 0.85 and the signal enters again on the next bar
+        result = engine.simulate(close, signal, stop_loss=0.1, take_profit=0.2)
+        self.assertEqual(result.trades[["entry_index", "exit_index"]].values.tolist(), [[1, 2], [3, 5]])
+        self.assertAlmostEqual(result.equity.iloc[-1, 0], 100 * 0.85 * 1.3)
+
+    def test_size(self):
+        close = pd.Series([1.0, 2.0, 2.0])
+        result = engine.simulate(close, [True, True, False], size=0.5)
+
+        # Only half of the cash was invested
+        self.assertAlmostEqual(result.equity.iloc[-1, 0], 150.0)
+        self.assertAlmostEqual(result.trades.loc[0, "return"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
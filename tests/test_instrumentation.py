@@ -0,0 +1,76 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from core.instrumentation import StageTracker, stage_tracker
+from strategies.indicators import IndicatorCache
+from strategies.sma_cross import SmaCrossover
+
+
+class TestStageTracker(unittest.TestCase):
+    def setUp(self):
+        self.result_dir = tempfile.mkdtemp()
+        self.tracker = StageTracker()
+
+    def tearDown(self):
+        self.tracker.disable()
+        shutil.rmtree(self.result_dir)
+
+    def test_disabled(self):
+        with self.tracker.stage("load") as event:
+            event["rows"] = 10
+
+        self.assertEqual(self.tracker.events, [])
+
+    def test_stage(self):
+        events_path = os.path.join(self.result_dir, "events.jsonl")
+        self.tracker.enable(events_path, trace_memory=True)
+        with self.tracker.stage("load", path="a.zip") as event:
+            with self.tracker.stage("parse") as inner_event:
+                inner_event["rows"] = 10
+            event["bytes"] = 100
+        with self.assertRaises(ValueError):
+            with self.tracker.stage("parse"):
+                raise ValueError("broken")
+
+        # Test that nested stages are recorded with their parent, fields, timings and memory marks
+        with open(events_path) as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual([(event["stage"], event["parent"]) for event in events],
+                         [("parse", "load"), ("load", None), ("parse", None)])
+        self.assertEqual((events[0]["rows"], events[1]["bytes"], events[1]["path"]), (10, 100, "a.zip"))
+        self.assertIn("broken", events[2]["error"])
+        self.assertTrue(all(event["seconds"] >= 0 and event["traced_peak_mb"] > 0 for event in events))
+
+        summary = self.tracker.get_summary()
+        self.assertEqual(summary.loc["parse", "calls"], 2)
+        self.assertEqual(summary.loc["parse", "rows"], 10)
+
+    def test_save_summary(self):
+        self.tracker.enable(None, profile=True)
+        with self.tracker.stage("signals"):
+            sum(range(1000))
+
+        paths = self.tracker.save_summary(self.result_dir)
+        self.assertEqual([os.path.basename(path) for path in paths], ["stage_summary.csv", "profile.txt"])
+        self.assertEqual(pd.read_csv(paths[0])["stage"].tolist(), ["signals"])
+
+    def test_pipeline_stages(self):
+        # Test that the strategies report to the shared tracker
+        stage_tracker.enable(None)
+        try:
+            price_data = pd.DataFrame({"close": 1 + np.sin(np.arange(300) / 10)})
+            SmaCrossover(price_data, 5, 20, 5, indicator_cache=IndicatorCache()).get_signals()
+            events = stage_tracker.events
+        finally:
+            stage_tracker.disable()
+
+        self.assertEqual([(event["stage"], event["strategy"], event["rows"]) for event in events],
+                         [("strategy.signals", "SmaCrossover", 300)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from main import get_parser, parse_params
+
+
+class TestMain(unittest.TestCase):
+    def test_import_is_light(self):
+        # The heavy libraries are loaded by the commands, not by the import of the CLI
+        code = ("import sys, main; "
+                "print(','.join(m for m in ('pandas', 'numba', 'vectorbt', 'matplotlib') if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "")
+
+    def test_report_is_light(self):
+        # report needs pandas for the ranking, but neither the simulation nor the plotting libraries
+        code = ("import sys, main; main.main(['report']); "
+                "print('loaded:' + ','.join(m for m in ('numba', 'vectorbt', 'matplotlib') if m in sys.modules))")
+        package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with tempfile.TemporaryDirectory() as work_dir:
+            output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                    cwd=work_dir, env={**os.environ, "PYTHONPATH": package_dir}).stdout
+        self.assertEqual(output.strip().splitlines()[-1], "loaded:")
+
+    def test_parse_params(self):
+        params = parse_params(["short_window=30", "num_std=2.5", "name=fast"])
+
+        self.assertEqual(params, {"short_window": 30, "num_std": 2.5, "name": "fast"})
+        self.assertEqual(parse_params(None), {})
+
+    def test_parser(self):
+        args = get_parser().parse_args(["backtest", "--strategy", "ema_cross", "--symbols", "ETHBTC",
+                                        "--engine", "numba", "--no-charts"])
+
+        self.assertEqual(args.command, "backtest")
+        self.assertEqual(args.symbols, ["ETHBTC"])
+        self.assertEqual(args.months, ["2025-02"])
+        self.assertFalse(get_parser().parse_args([]).command)
+        self.assertEqual(args.interval, "1m")
+        # Only 1m archives are fetched, higher intervals are derived from them
+        self.assertFalse(hasattr(get_parser().parse_args(["fetch"]), "interval"))
+
+
+if __name__ == '__main__':
+    unittest.main()
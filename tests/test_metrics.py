@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+from core import engine
+from core.metrics import compute_metrics, compute_simulation_metrics, get_bars_per_year
+
+
+class TestMetrics(unittest.TestCase):
+    def test_compute_metrics(self):
+        equity = pd.DataFrame({"up": [100.0, 110.0, 99.0, 121.0], "flat": [100.0, 100.0, 100.0, 100.0]})
+        metrics = compute_metrics(equity, trade_columns=[0, 0, 0], trade_returns=[0.1, -0.1, 0.3],
+                                  exposure=[0.75, 0.0])
+
+        self.assertEqual(list(metrics.index), ["up", "flat"])
+        self.assertAlmostEqual(metrics.loc["up", "total_return"], 0.21)
+        self.assertAlmostEqual(metrics.loc["up", "max_drawdown"], -0.1)
+        self.assertAlmostEqual(metrics.loc["up", "winrate"], 2 / 3)
+        self.assertAlmostEqual(metrics.loc["up", "expectancy"], 0.1)
+        self.assertAlmostEqual(metrics.loc["up", "exposure_time"], 0.75)
+        # A column without trades gets zero trade statistics
+        self.assertEqual(metrics.loc["flat", ["winrate", "expectancy", "total_trades"]].tolist(), [0, 0, 0])
+
+    def test_compute_simulation_metrics_matches_vectorbt(self):
+        random_generator = np.random.default_rng(3)
+        close = pd.DataFrame(np.cumprod(1 + random_generator.normal(0, 0.01, (1000, 4)), axis=0))
+        signal = pd.DataFrame(random_generator.random((1000, 4)) > 0.6)
+
+        metrics = compute_simulation_metrics(engine.simulate(close, signal))
+        portfolio = vbt.Portfolio.from_signals(close, signal, ~signal, freq="1min")
+
+        np.testing.assert_allclose(metrics["total_return"], portfolio.total_return())
+        np.testing.assert_allclose(metrics["sharpe_ratio"], portfolio.sharpe_ratio())
+        np.testing.assert_allclose(metrics["max_drawdown"], portfolio.max_drawdown())
+        np.testing.assert_allclose(metrics["winrate"], portfolio.trades.closed.win_rate())
+
+    def test_get_bars_per_year(self):
+        self.assertEqual(get_bars_per_year("1min"), 525600)
+        self.assertEqual(get_bars_per_year("1h"), 8760)
+
+
+if __name__ == '__main__':
+    unittest.main()
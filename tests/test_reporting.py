@@ -0,0 +1,110 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from core.reporting import ChartReporter, downsample_lttb, downsample_minmax
+from strategies.sma_cross import SmaCrossover
+
+
+class TestDownsampling(unittest.TestCase):
+    def setUp(self):
+        random_generator = np.random.default_rng(9)
+        self.y = np.cumsum(random_generator.normal(0, 1, 10000))
+        self.y[5000] = 1000.0
+
+    def test_downsample_lttb(self):
+        kept = downsample_lttb(np.arange(len(self.y)), self.y, 500)
+
+        # Test that the ends are kept, the positions grow and the spike survives
+        self.assertEqual(len(kept), 500)
+        self.assertEqual((kept[0], kept[-1]), (0, len(self.y) - 1))
+        self.assertTrue((np.diff(kept) > 0).all())
+        self.assertIn(5000, kept)
+        # A short series is kept as is
+        self.assertEqual(len(downsample_lttb(np.arange(10), self.y[:10], 500)), 10)
+
+    def test_downsample_minmax(self):
+        kept = downsample_minmax(self.y, 100)
+
+        self.assertLessEqual(len(kept), 200)
+        self.assertIn(5000, kept)
+        self.assertEqual(self.y[kept].min(), self.y.min())
+
+
+class TestChartReporter(unittest.TestCase):
+    def setUp(self):
+        self.result_dir = tempfile.mkdtemp()
+        close = [0.03 + i * 0.0001 + 0.0005 * np.sin(i / 20) for i in range(1440)]
+        self.price_data = pd.concat([pd.DataFrame({"close": close, "symbol": symbol})
+                                     for symbol in ["ETHBTC", "SOLBTC"]], ignore_index=True)
+        self.strategy = SmaCrossover(self.price_data, short_window=30, long_window=80, volatility_window=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.result_dir)
+
+    def test_submit_backtest_background(self):
+        with ChartReporter(self.result_dir, max_points=300, background=True) as reporter:
+            reporter.submit_backtest(self.strategy)
+
+        # Test that every pair got its own chart named by the strategy and its parameters
+        self.assertEqual(sorted(os.listdir(self.result_dir)),
+                         ["SmaCrossover_30_80_10_ETHBTC.png", "SmaCrossover_30_80_10_SOLBTC.png"])
+
+    def test_failed_chart(self):
+        # A frame without any line column can't be drawn
+        frame = pd.DataFrame({"position": [0, 1, -1]})
+        with self.assertLogs(level="ERROR"):
+            with ChartReporter(self.result_dir, background=True) as reporter:
+                reporter.submit(frame, "broken", "broken.png")
+                reporter.submit(self.price_data[["close"]], "close", "close.png")
+
+        # Test that the failed chart is skipped without failing the other ones
+        self.assertEqual(os.listdir(self.result_dir), ["close.png"])
+
+    def run_fresh(self, code):
+        # matplotlib and vectorbt are already loaded in the test process, so the import order is tested in a new one
+        package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        setup = ("import sys, types\n"
+                 "import numpy as np\n"
+                 "import pandas as pd\n"
+                 "from core.reporting import ChartReporter\n"
+                 "price_data = pd.DataFrame({'close': [0.03 + i * 0.0001 + 0.0005 * np.sin(i / 20)\n"
+                 "                                     for i in range(1440)]})\n")
+        subprocess.run([sys.executable, "-c", setup + code], check=True, cwd=self.result_dir,
+                       env={**os.environ, "PYTHONPATH": package_dir})
+
+        chart_dir = os.path.join(self.result_dir, "charts")
+        return sorted(os.listdir(chart_dir)) if os.path.isdir(chart_dir) else []
+
+    def test_background_with_partial_ipython(self):
+        # vectorbt imports IPython on the main thread, so the worker may see it half initialized
+        code = ("with ChartReporter('charts', background=True) as reporter:\n"
+                "    sys.modules['IPython'] = types.ModuleType('IPython')\n"
+                "    reporter.submit(price_data, 'close', 'close.png')\n")
+
+        self.assertEqual(self.run_fresh(code), ["close.png"])
+
+    def test_background_with_vectorbt_backtest(self):
+        code = ("from core.backtester import Backtester\n"
+                "from strategies.sma_cross import SmaCrossover\n"
+                "strategy = SmaCrossover(price_data, short_window=30, long_window=80, volatility_window=10)\n"
+                "with ChartReporter('charts', background=True) as reporter:\n"
+                "    Backtester(price_data, strategy, reporter=reporter).get_backtest_results()\n")
+
+        # Test that the charts drawn while vectorbt is imported are saved
+        self.assertEqual(self.run_fresh(code), ["SmaCrossover_30_80_10.png"])
+
+    def test_disabled(self):
+        reporter = ChartReporter(self.result_dir, enabled=False)
+        reporter.submit_backtest(self.strategy)
+        reporter.close()
+
+        self.assertEqual(os.listdir(self.result_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from core.resample import Resampler, align_timeframes, resample_ohlcv
+from core.store import ParquetStore
+from strategies.sma_cross import SmaCrossover
+
+
+class TestResample(unittest.TestCase):
+    def setUp(self):
+        random_generator = np.random.default_rng(14)
+        frames = []
+        for symbol in ["ETHBTC", "SOLBTC"]:
+            close = 1 + np.cumsum(random_generator.normal(0, 0.01, 600))
+            frames.append(pd.DataFrame({
+                "timestamp": pd.date_range("2025-02-01", periods=600, freq="1min"),
+                "open": close - 0.001,
+                "high": close + 0.01,
+                "low": close - 0.01,
+                "close": close,
+                "volume": random_generator.uniform(1, 2, 600),
+                "symbol": symbol
+            }))
+        self.price_data = pd.concat(frames, ignore_index=True)
+
+    def test_resample_ohlcv(self):
+        resampled = resample_ohlcv(self.price_data, "1h")
+
+        # Test the aggregation against pandas resample of every pair
+        self.assertEqual(resampled.columns.tolist(), self.price_data.columns.tolist())
+        for symbol, bars in resampled.groupby("symbol"):
+            expected = (self.price_data[self.price_data["symbol"] == symbol].set_index("timestamp")
+                        .resample("1h").agg({"open": "first", "high": "max", "low": "min", "close": "last",
+                                             "volume": "sum"}))
+            np.testing.assert_allclose(bars[["open", "high", "low", "close", "volume"]].to_numpy(),
+                                       expected.to_numpy())
+            self.assertEqual(bars["timestamp"].tolist(), expected.index.tolist())
+
+        # Test that gaps in the source don't create empty bars
+        gappy = self.price_data[(self.price_data["timestamp"].dt.hour != 3) & (self.price_data["symbol"] == "ETHBTC")]
+        self.assertEqual(len(resample_ohlcv(gappy, "1h")), 9)
+
+        with self.assertRaises(ValueError):
+            resample_ohlcv(self.price_data, "7m")
+
+    def test_align_timeframes(self):
+        hourly = resample_ohlcv(self.price_data, "1h")
+        aligned = align_timeframes(self.price_data, hourly, "1h")
+
+        # Test that an hourly close is seen only from the last minute of the hour on, in every pair
+        self.assertTrue(aligned.index.equals(self.price_data.index))
+        for symbol in ["ETHBTC", "SOLBTC"]:
+            rows = self.price_data["symbol"] == symbol
+            close, close_1h = self.price_data.loc[rows, "close"].to_numpy(), aligned.loc[rows, "close_1h"].to_numpy()
+            self.assertTrue(np.isnan(close_1h[:59]).all())
+            self.assertEqual(close_1h[59], close[59])
+            self.assertEqual(close_1h[119], close[119])
+            self.assertTrue((close_1h[60:119] == close[59]).all())
+
+    def test_resampler(self):
+        root_dir = tempfile.mkdtemp()
+        try:
+            store = ParquetStore(root_dir)
+            for symbol, bars in self.price_data.groupby("symbol"):
+                store.write_partition(bars, symbol, "1m", "2025-02")
+            resampler = Resampler(store)
+
+            # Test that derived partitions are written once and read back like downloaded ones
+            self.assertEqual(resampler.update(interval="15m"), ["ETHBTC/15m/2025-02", "SOLBTC/15m/2025-02"])
+            self.assertEqual(resampler.update(interval="15m"), [])
+            bars = resampler.read(["SOLBTC"], "15m", columns=["close"])
+            self.assertEqual(len(bars), 40)
+
+            # Test that a rewritten source rebuilds its derived partition
+            store.write_partition(self.price_data[self.price_data["symbol"] == "ETHBTC"].iloc[:300], "ETHBTC", "1m",
+                                  "2025-02", overwrite=True)
+            self.assertEqual(resampler.update(interval="15m"), ["ETHBTC/15m/2025-02"])
+
+            # Test that several timeframes come back aligned on the 1m rows
+            data_frame = resampler.read_timeframes(intervals=["1m", "5m", "1h"], columns=["close"])
+            self.assertEqual(len(data_frame), 900)
+            self.assertIn("close_5m", data_frame.columns)
+            self.assertEqual(data_frame["close_1h"].notna().sum(), 300 - 59 + 600 - 59)
+        finally:
+            shutil.rmtree(root_dir)
+
+    def test_strategy_get_timeframe(self):
+        strategy = SmaCrossover(self.price_data, short_window=5, long_window=20, volatility_window=5)
+        close_1h = strategy.get_timeframe("1h")
+
+        expected = align_timeframes(self.price_data, resample_ohlcv(self.price_data, "1h"), "1h")["close_1h"]
+        pd.testing.assert_series_equal(close_1h, expected)
+        self.assertIs(strategy.get_timeframe("1h"), close_1h)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from core.backtester import Backtester
+from core.results import ResultsStore
+from core.sweep import ParameterSweep
+from strategies.sma_cross import SmaCrossover
+from tests.helpers import random_walk
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.result_dir = tempfile.mkdtemp()
+        self.results_store = ResultsStore(os.path.join(self.result_dir, "results.sqlite"))
+        # Write the backtest results next to the database instead of the tracked results folder
+        result_dir_patch = patch.object(Backtester, "RESULT_DIR", self.result_dir)
+        result_dir_patch.start()
+        self.addCleanup(result_dir_patch.stop)
+        self.symbol_metrics = pd.DataFrame({"total_return": [0.1, -0.2], "sharpe_ratio": [1.5, np.nan],
+                                            "total_trades": [3, 0]}, index=pd.Index(["ETHBTC", "SOLBTC"]))
+
+    def tearDown(self):
+        shutil.rmtree(self.result_dir)
+
+    def test_put_get(self):
+        key = ResultsStore.get_key("sma_cross", {"short_window": 10}, "dataset", "numba-1")
+        self.assertIsNone(self.results_store.get(key))
+        self.results_store.put(key, "sma_cross", {"short_window": 10}, "dataset", "numba-1", self.symbol_metrics,
+                               summary={"total_return": 0.05}, seconds=1.5)
+
+        # Test that the metrics come back unchanged, missing values and integer counts included
+        summary, symbol_metrics = self.results_store.get(key)
+        self.assertEqual(summary, {"total_return": 0.05})
+        pd.testing.assert_frame_equal(symbol_metrics, self.symbol_metrics, check_names=False)
+        # Test that the key depends on every part of the run description
+        self.assertNotEqual(key, ResultsStore.get_key("sma_cross", {"short_window": 20}, "dataset", "numba-1"))
+        self.assertNotEqual(key, ResultsStore.get_key("sma_cross", {"short_window": 10}, "dataset", "numba-2"))
+
+    def test_query_compare(self):
+        for short_window in [10, 20]:
+            key = ResultsStore.get_key("sma_cross", {"short_window": short_window}, "dataset", "numba-1")
+            self.results_store.put(key, "sma_cross", {"short_window": short_window}, "dataset", "numba-1",
+                                   self.symbol_metrics * short_window / 10)
+        self.results_store.put("other", "ema_cross", {}, "dataset", "numba-1", self.symbol_metrics)
+
+        runs = self.results_store.query(strategy="sma_cross")
+        self.assertEqual(len(runs), 4)
+        self.assertEqual(set(runs["symbol"]), {"ETHBTC", "SOLBTC"})
+
+        comparison = self.results_store.compare("total_return", strategy="sma_cross")
+        self.assertEqual(comparison.columns.tolist(), ["ETHBTC", "SOLBTC"])
+        np.testing.assert_allclose(sorted(comparison["ETHBTC"]), [0.1, 0.2])
+
+    def test_dataset_fingerprint(self):
+        close = pd.Series([1.0, 2.0, 3.0], name="close")
+        changed = close.copy()
+        changed.iloc[1] = 2.5
+
+        self.assertEqual(ResultsStore.get_dataset_fingerprint(close), ResultsStore.get_dataset_fingerprint(close.copy()))
+        self.assertNotEqual(ResultsStore.get_dataset_fingerprint(close), ResultsStore.get_dataset_fingerprint(changed))
+
+
+class TestMemoizedRuns(unittest.TestCase):
+    def setUp(self):
+        self.result_dir = tempfile.mkdtemp()
+        self.results_store = ResultsStore(os.path.join(self.result_dir, "results.sqlite"))
+        # Write the backtest results next to the database instead of the tracked results folder
+        result_dir_patch = patch.object(Backtester, "RESULT_DIR", self.result_dir)
+        result_dir_patch.start()
+        self.addCleanup(result_dir_patch.stop)
+        self.close = pd.Series(random_walk(20),
+                               index=pd.date_range("2025-02-01", periods=1440, freq="1min"), name="close")
+
+    def tearDown(self):
+        shutil.rmtree(self.result_dir)
+
+    def test_backtester(self):
+        price_data = pd.concat([pd.DataFrame({"timestamp": self.close.index, "close": self.close.to_numpy(),
+                                              "symbol": symbol}) for symbol in ["ETHBTC", "SOLBTC"]],
+                               ignore_index=True)
+        strategy = SmaCrossover(price_data, short_window=30, long_window=80, volatility_window=10)
+        metrics, result = Backtester(price_data, strategy, engine="numba", results_store=self.results_store)\
+            .get_backtest_results()
+
+        # Test that the repeated run comes from the store without touching the strategy
+        with patch.object(SmaCrossover, "get_metrics") as get_metrics:
+            stored_metrics, stored_result = Backtester(price_data, strategy, engine="numba",
+                                                       results_store=self.results_store).get_backtest_results()
+        get_metrics.assert_not_called()
+        self.assertEqual(stored_metrics, metrics)
+        pd.testing.assert_frame_equal(stored_result, result)
+
+        # Test that other settings make another run
+        Backtester(price_data, strategy, engine="numba", fees=0.001,
+                   results_store=self.results_store).get_backtest_results()
+        self.assertEqual(len(self.results_store.query()), 4)
+
+    def test_sweep(self):
+        grid = {"short_windows": [10, 30], "long_windows": [80], "volatility_windows": [10]}
+        sweep = ParameterSweep(self.close, results_store=self.results_store)
+        sweep.run(engine_name="numba", **grid)
+
+        # Test that a grown grid only simulates the new combinations
+        grid["long_windows"] = [80, 120]
+        with patch.object(ParameterSweep, "simulate", wraps=sweep.simulate) as simulate:
+            ranked = sweep.run(engine_name="numba", **grid)
+        self.assertEqual(simulate.call_args.args[0].shape[1], 2)
+
+        expected = ParameterSweep(self.close).run(engine_name="numba", **grid)
+        pd.testing.assert_frame_equal(ranked, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+import vectorbt as vbt
+from core.backtester import Backtester
+from core.cache import MatrixCache
+from core.runner import BacktestJob, ParallelRunner
+from strategies.sma_cross import SmaCrossover
+from tests.helpers import random_walk
+
+
+class TestParallelRunner(unittest.TestCase):
+    def setUp(self):
+        # Create a (1440 minutes x 3 pairs) matrix of noisy random walks
+        self.close = pd.DataFrame(random_walk(7, (1440, 3)),
+                                  index=pd.date_range("2025-02-01", periods=1440, freq="1min"),
+                                  columns=["ETHBTC", "SOLBTC", "NEOBTC"])
+        self.jobs = [
+            BacktestJob(SmaCrossover, {"short_window": 30, "long_window": 80, "volatility_window": 10},
+                        ["ETHBTC", "SOLBTC"]),
+            BacktestJob(SmaCrossover, {"short_window": 10, "long_window": 50, "volatility_window": 20}, ["NEOBTC"])
+        ]
+
+    def test_run(self):
+        results = ParallelRunner(self.close, max_workers=2).run(self.jobs)
+
+        # Test that every job reported a row per symbol with its wall time
+        self.assertEqual(results[["job", "symbol"]].values.tolist(),
+                         [[0, "ETHBTC"], [0, "SOLBTC"], [1, "NEOBTC"]])
+        self.assertTrue((results["job_time"] > 0).all())
+
+        # Test that a worker gets the same result as an in-process run
+        strategy = SmaCrossover(pd.DataFrame({"close": self.close["NEOBTC"]}), short_window=10, long_window=50,
+                                volatility_window=20)
+        signal = strategy.get_signals()["signal"].astype(bool)
+        expected = vbt.Portfolio.from_signals(self.close["NEOBTC"], signal, ~signal, freq="1min").total_return()
+        self.assertAlmostEqual(results.loc[2, "total_return"], expected)
+
+    def test_run_numba_engine_with_fees(self):
+        results = ParallelRunner(self.close, max_workers=2, engine="numba", fees=0.001).run(self.jobs)
+
+        # Test that a job gives the same metrics as a Backtester run with the same engine and costs
+        price_data = pd.DataFrame({"close": self.close["NEOBTC"]})
+        strategy = SmaCrossover(price_data, short_window=10, long_window=50, volatility_window=20)
+        expected = Backtester(price_data, strategy, engine="numba", fees=0.001).run_portfolio(
+            *strategy.get_signal_matrices())
+        self.assertAlmostEqual(results.loc[2, "total_return"], expected["total_return"].iloc[0])
+        self.assertAlmostEqual(results.loc[2, "sharpe_ratio"], expected["sharpe_ratio"].iloc[0])
+
+    def test_run_from_matrix_cache(self):
+        root_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root_dir)
+        matrix_cache = MatrixCache(root_dir)
+        key = MatrixCache.get_key("test_runner")
+        matrix_cache.put(key, {"close": self.close})
+
+        # Test that workers opening the cached matrix get the same results as from shared memory
+        results = ParallelRunner(max_workers=2, matrix_cache=matrix_cache, cache_key=key).run(self.jobs)
+        pd.testing.assert_frame_equal(results.drop(columns="job_time"),
+                                      ParallelRunner(self.close, max_workers=2).run(self.jobs).drop(
+                                          columns="job_time"))
+
+
+if __name__ == '__main__':
+    unittest.main()
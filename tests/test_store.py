@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+from core.store import ParquetStore
+
+
+class TestParquetStore(unittest.TestCase):
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.store = ParquetStore(self.root_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.root_dir)
+
+    @staticmethod
+    def make_month(year_month, rows=60, start_price=1.0):
+        return pd.DataFrame({
+            "timestamp": pd.date_range(f"{year_month}-01", periods=rows, freq="1min"),
+            "open": np.full(rows, start_price, dtype=np.float32),
+            "close": np.linspace(start_price, start_price * 2, rows, dtype=np.float32),
+            "volume": np.ones(rows)
+        })
+
+    def test_write_partition(self):
+        written = self.store.write_partition(self.make_month("2025-02"), "ETHBTC", "1m", "2025-02")
+
+        # Test the Hive layout and the manifest entry
+        self.assertTrue(written)
+        self.assertTrue(os.path.exists(os.path.join(self.root_dir, "symbol=ETHBTC", "interval=1m",
+                                                    "year_month=2025-02", "data.parquet")))
+        manifest = self.store.get_manifest()
+        self.assertEqual(manifest[["symbol", "interval", "year_month", "rows"]].values.tolist(),
+                         [["ETHBTC", "1m", "2025-02", 60]])
+        self.assertTrue(self.store.has_partition("ETHBTC", "1m", "2025-02"))
+
+        # Test that an existing partition is kept unless it is overwritten explicitly
+        self.assertFalse(self.store.write_partition(self.make_month("2025-02", rows=10), "ETHBTC", "1m", "2025-02"))
+        self.assertEqual(self.store.get_manifest()["rows"].tolist(), [60])
+
+    def test_read(self):
+        # Append months and pairs one by one
+        for symbol, start_price in [("ETHBTC", 1.0), ("SOLBTC", 5.0), ("NEOBTC", 9.0)]:
+            for year_month in ["2025-01", "2025-02"]:
+                self.store.write_partition(self.make_month(year_month, start_price=start_price),
+                                           symbol, "1m", year_month)
+
+        data_frame = self.store.read(symbols=["SOLBTC", "ETHBTC"], interval="1m", year_months=["2025-02"],
+                                     columns=["close"])
+
+        # Test that only the requested partitions and columns were loaded
+        self.assertEqual(list(data_frame.columns), ["timestamp", "close", "symbol"])
+        self.assertEqual(sorted(data_frame["symbol"].unique()), ["ETHBTC", "SOLBTC"])
+        self.assertEqual(len(data_frame), 120)
+        self.assertTrue((data_frame["timestamp"] >= pd.Timestamp("2025-02-01")).all())
+        self.assertEqual(data_frame["close"].dtype, np.float32)
+
+        # Test the predicate pushdown of an extra filter expression
+        filtered = self.store.read(symbols=["ETHBTC"], columns=["close"], filter=ds.field("close") > 1.5)
+        self.assertTrue((filtered["close"] > 1.5).all())
+        self.assertEqual(sorted(filtered["timestamp"].dt.strftime("%Y-%m").unique()), ["2025-01", "2025-02"])
+
+    def test_read_without_matching_partitions(self):
+        self.store.write_partition(self.make_month("2025-02"), "ETHBTC", "1m", "2025-02")
+
+        # Test that a request no partition matches returns an empty frame instead of failing
+        data_frame = self.store.read(interval="5m", columns=["close"])
+        self.assertTrue(data_frame.empty)
+        self.assertEqual(list(data_frame.columns), ["timestamp", "close", "symbol"])
+        self.assertTrue(ParquetStore(os.path.join(self.root_dir, "empty")).read().empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
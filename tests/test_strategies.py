@@ -1,14 +1,18 @@
-import os
 import unittest
+import numpy as np
 import pandas as pd
+from strategies.indicators import IndicatorCache
+from strategies.bollinger import BollingerReversion
+from strategies.ema_cross import EmaCrossover
 from strategies.sma_cross import SmaCrossover
+from tests.helpers import random_walk
 
 
 class TestSmaCrossoverStrategy(unittest.TestCase):
     def setUp(self):
-        # Create a frame of 1440 (24 hours in minutes) lines with close prices in increasing tendency
+        # Create a frame of 1440 (24 hours in minutes) lines with oscillating close prices in increasing tendency
         self.price_data = pd.DataFrame({
-            "close": [0.03 + i * 0.0001 for i in range(1440)]
+            "close": [0.03 + i * 0.0001 + 0.0005 * np.sin(i / 20) for i in range(1440)]
         })
         self.strategy = SmaCrossover(self.price_data, short_window=30, long_window=80, volatility_window=10)
 
@@ -38,8 +42,7 @@ class TestSmaCrossoverStrategy(unittest.TestCase):
         # Test if the columns are created
         self.assertIn("sma_short", backtest.columns)
         self.assertIn("sma_long", backtest.columns)
-        # Test if the curve was saved
-        self.assertTrue(os.path.exists("results/screenshots/sma_curve.png"), "SMA curve png should be created")
+        self.assertEqual(len(backtest), len(self.price_data))
 
     def test_get_metrics(self):
         metrics = self.strategy.get_metrics()
@@ -59,6 +62,125 @@ class TestSmaCrossoverStrategy(unittest.TestCase):
         self.assertTrue(0 <= metrics["winrate"] <= 1, "Winrate must be within [0, 1]")
         self.assertTrue(0 <= metrics["exposure_time"] <= 1, "Exposure time must be within [0, 1]")
 
+    def test_generate_signals_multi_symbol(self):
+        # Stack the same prices twice as two different pairs
+        price_data = pd.concat([
+            self.price_data.assign(symbol="ETHBTC"),
+            self.price_data.assign(symbol="SOLBTC")
+        ], ignore_index=True)
+        strategy = SmaCrossover(price_data, short_window=30, long_window=80, volatility_window=10)
+        signals = strategy.generate_signals()
+        single = self.strategy.generate_signals()
+
+        # Test that rolling windows restart at the pair boundary
+        second_pair = price_data["symbol"] == "SOLBTC"
+        self.assertTrue(strategy.get_indicator("sma", 80)[second_pair].iloc[:79].isna().all())
+        # Test that every pair gets the same signals as when it runs alone
+        for symbol in ["ETHBTC", "SOLBTC"]:
+            pair = signals[price_data["symbol"] == symbol]
+            self.assertEqual(pair["signal"].tolist(), single["signal"].tolist())
+            self.assertEqual(pair["position"].tolist(), single["position"].tolist())
+
+    def test_price_data_is_not_modified(self):
+        self.strategy.run_backtest()
+        self.strategy.get_metrics()
+
+        self.assertEqual(list(self.price_data.columns), ["close"])
+
+    def test_shared_indicator_cache(self):
+        indicator_cache = IndicatorCache()
+        first = SmaCrossover(self.price_data, short_window=30, long_window=80, volatility_window=10,
+                             indicator_cache=indicator_cache)
+        second = SmaCrossover(self.price_data, short_window=50, long_window=80, volatility_window=10,
+                              indicator_cache=indicator_cache)
+        first.generate_signals()
+        second.generate_signals()
+
+        # The 80-period SMA and the volatility are computed once for both strategies
+        self.assertEqual(len(indicator_cache), 4)
+        self.assertIs(first.get_indicator("sma", 80), second.get_indicator("sma", 80))
+
+    def test_indicator_cache_lifetime(self):
+        indicator_cache = IndicatorCache(max_frames=2)
+        price_data = pd.DataFrame({"close": [1.0, 2.0, 3.0]})
+        indicator_cache.get(price_data, "sma", 2)
+
+        # Test that a modified frame is computed again once discarded
+        price_data.loc[2, "close"] = 5.0
+        indicator_cache.discard(price_data)
+        self.assertEqual(indicator_cache.get(price_data, "sma", 2).iloc[-1], 3.5)
+
+        # Test that the cache keeps only the most recently used frames and none after they are collected
+        frames = [pd.DataFrame({"close": [1.0, 2.0, 3.0]}) for _ in range(3)]
+        for frame in frames:
+            indicator_cache.get(frame, "sma", 2)
+        self.assertEqual(len(indicator_cache), 2)
+        del frames, frame
+        self.assertEqual(len(indicator_cache), 0)
+
+    def test_update_matches_batch(self):
+        # A noisy random walk for two pairs, streamed bar by bar in time order
+        close = random_walk(11, (1440, 2))
+        price_data = pd.concat([
+            pd.DataFrame({"timestamp": range(1440), "symbol": symbol, "close": close[:, number]})
+            for number, symbol in enumerate(["ETHBTC", "SOLBTC"])
+        ], ignore_index=True)
+        strategy = SmaCrossover(price_data, short_window=30, long_window=80, volatility_window=10)
+        batch = strategy.generate_signals()
+
+        streamed = {}
+        for index, bar in price_data.sort_values(["timestamp", "symbol"]).iterrows():
+            streamed[index] = strategy.update(bar)
+        streamed = pd.DataFrame.from_dict(streamed, orient="index").reindex(batch.index)
+
+        self.assertGreater(batch["signal"].sum(), 0)
+        self.assertEqual(streamed["signal"].tolist(), batch["signal"].tolist())
+        self.assertEqual(streamed["position"].tolist(), batch["position"].tolist())
+
+
+
+class TestEmaCrossoverStrategy(unittest.TestCase):
+    def setUp(self):
+        # Oscillating prices cross the averages back and forth
+        self.price_data = pd.DataFrame({"close": 0.03 + 0.002 * np.sin(np.arange(1440) / 50)})
+        self.strategy = EmaCrossover(self.price_data, fast_window=10, slow_window=40)
+
+    def test_generate_signals(self):
+        signals = self.strategy.generate_signals()
+        ema_fast = self.price_data["close"].ewm(span=10, adjust=False).mean()
+        ema_slow = self.price_data["close"].ewm(span=40, adjust=False).mean()
+
+        # Test the warm-up and the crossover condition
+        self.assertTrue((signals["signal"].iloc[:40] == 0).all())
+        self.assertTrue(((signals["signal"] == 1) == ((ema_fast > ema_slow) & (signals.index >= 40))).all())
+        self.assertEqual(signals["position"].tolist(), signals["signal"].diff().shift(1).fillna(0).tolist())
+        self.assertGreater(self.strategy.get_metrics()["total_trades"], 0)
+
+
+class TestBollingerReversionStrategy(unittest.TestCase):
+    def setUp(self):
+        self.price_data = pd.DataFrame({"close": random_walk(5)})
+        self.strategy = BollingerReversion(self.price_data, window=20, num_std=2.0)
+
+    def test_generate_signals(self):
+        signal = self.strategy.generate_signals()["signal"]
+        lower_band, middle_band, _ = self.strategy.get_bands()
+        close = self.price_data["close"]
+
+        # Test that a position opens below the lower band and is held until the close is back to the middle band
+        opened = (signal == 1) & (signal.shift(1, fill_value=0) == 0)
+        closed = (signal == 0) & (signal.shift(1, fill_value=0) == 1)
+        self.assertGreater(opened.sum(), 0)
+        self.assertTrue((close[opened] < lower_band[opened]).all())
+        self.assertTrue((close[closed] >= middle_band[closed]).all())
+        self.assertTrue((close[signal == 1] < middle_band[signal == 1]).all())
+
+    def test_run_backtest(self):
+        backtest = self.strategy.run_backtest()
+
+        self.assertEqual(backtest.columns.tolist(),
+                         ["close", "lower_band", "middle_band", "upper_band", "signal", "position"])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
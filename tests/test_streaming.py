@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.streaming import RollingMean, RollingStd, ExpandingMean
+from tests.helpers import random_walk
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.values = pd.Series(random_walk(5, 2000))
+
+    def stream(self, indicator, values):
+        return np.array([indicator.update(value) for value in values])
+
+    def test_rolling_mean(self):
+        np.testing.assert_allclose(self.stream(RollingMean(50), self.values),
+                                   self.values.rolling(50).mean(), rtol=1e-9)
+
+    def test_rolling_std(self):
+        for window in [2, 10, 200]:
+            np.testing.assert_allclose(self.stream(RollingStd(window), self.values),
+                                       self.values.rolling(window).std(), rtol=1e-7)
+
+    def test_expanding_mean(self):
+        values = self.values.rolling(10).std()
+        np.testing.assert_allclose(self.stream(ExpandingMean(), values), values.expanding().mean(), rtol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
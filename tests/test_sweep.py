@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+import pandas as pd
+from core.sweep import ParameterSweep
+from strategies.sma_cross import SmaCrossover
+from tests.helpers import random_walk
+
+
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        # Create a frame of 1440 (24 hours in minutes) lines with a noisy random walk of close prices
+        self.close = pd.Series(random_walk(42),
+                               index=pd.date_range("2025-02-01", periods=1440, freq="1min"), name="close")
+        self.grid = {"short_windows": [10, 30], "long_windows": [30, 80], "volatility_windows": [10, 20]}
+        self.sweep = ParameterSweep(self.close)
+
+    def test_get_signals(self):
+        signals = self.sweep.get_signals(**self.grid)
+
+        # Combinations with short_window >= long_window are skipped
+        self.assertEqual(signals.shape, (1440, 6))
+        self.assertNotIn((30, 30, 10), signals.columns)
+
+        # Test that every column matches a single strategy run with the same parameters
+        for short_window, long_window, volatility_window in signals.columns:
+            strategy = SmaCrossover(pd.DataFrame({"close": self.close.to_numpy()}), short_window=short_window,
+                                    long_window=long_window, volatility_window=volatility_window)
+            expected = strategy.generate_signals()["signal"].astype(bool).to_numpy()
+            np.testing.assert_array_equal(signals[(short_window, long_window, volatility_window)].to_numpy(),
+                                          expected)
+
+    def test_run(self):
+        ranked = self.sweep.run(**self.grid)
+
+        # Test that the table has a ranked row per combination
+        self.assertEqual(len(ranked), 6)
+        self.assertEqual(ranked["rank"].tolist(), list(range(1, 7)))
+        self.assertTrue(ranked["total_return"].is_monotonic_decreasing)
+
+    def test_run_numba_engine(self):
+        vectorbt_ranked = self.sweep.run(**self.grid)
+        numba_ranked = self.sweep.run(engine_name="numba", **self.grid)
+
+        # Both engines rank the combinations by the same total returns
+        np.testing.assert_allclose(numba_ranked["total_return"], vectorbt_ranked["total_return"])
+
+    def test_run_empty_grid(self):
+        with self.assertRaises(ValueError):
+            self.sweep.run(short_windows=[50], long_windows=[10], volatility_windows=[10])
+
+
+if __name__ == '__main__':
+    unittest.main()
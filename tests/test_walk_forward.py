@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+import pandas as pd
+from core.sweep import ParameterSweep
+from core.walk_forward import WalkForward
+from tests.helpers import random_walk
+
+
+class TestWalkForward(unittest.TestCase):
+    def setUp(self):
+        # Create 3 days of minutes with a noisy random walk of close prices
+        self.close = pd.Series(random_walk(21, 4320),
+                               index=pd.date_range("2025-02-01", periods=4320, freq="1min"), name="close")
+        self.grid = {"short_windows": [10, 30], "long_windows": [60, 120], "volatility_windows": [10, 30]}
+        self.walk_forward = WalkForward(self.close, train_size=1440, test_size=720, max_workers=2)
+
+    def test_get_folds(self):
+        self.assertEqual(self.walk_forward.get_folds(),
+                         [(0, 1440, 2160), (720, 2160, 2880), (1440, 2880, 3600), (2160, 3600, 4320)])
+
+    def test_run(self):
+        folds, equity = self.walk_forward.run(**self.grid)
+
+        # Test that the out-of-sample curve covers every test window exactly once
+        self.assertEqual(len(folds), 4)
+        self.assertEqual(len(equity), 4320 - 1440)
+        self.assertEqual(equity.index[0], self.close.index[1440])
+
+        # Test that the first fold picked the best train combination and the curve follows its test returns
+        first = folds.iloc[0]
+        train_ranked = ParameterSweep(self.close.iloc[:1440]).run(**self.grid)
+        self.assertAlmostEqual(first["train_total_return"], train_ranked["total_return"].max())
+        self.assertAlmostEqual(equity.iloc[719], 1 + first["test_total_return"])
+        # The stitched curve ends with the product of all test returns
+        self.assertAlmostEqual(equity.iloc[-1], np.prod(1 + folds["test_total_return"]))
+
+    def test_run_without_trades(self):
+        # The long window is longer than the first train window, so no combination holds a position in it
+        walk_forward = WalkForward(self.close, train_size=300, test_size=300, sort_by="sharpe_ratio")
+        folds, equity = walk_forward.run(short_windows=[50], long_windows=[400], volatility_windows=[30])
+
+        # Test that the fold without trades kept the first combination and every fold was still run
+        self.assertEqual(len(folds), len(walk_forward.get_folds()))
+        self.assertTrue(np.isnan(folds.iloc[0]["train_sharpe_ratio"]))
+        self.assertEqual(len(equity), 4320 - 300)
+
+    def test_run_short_history(self):
+        with self.assertRaises(ValueError):
+            WalkForward(self.close.iloc[:100], train_size=1440, test_size=720).run(**self.grid)
+
+
+if __name__ == '__main__':
+    unittest.main()